@@ -1,14 +1,19 @@
 # ./factcheck/__init__.py
 
 import time
+import queue
+import threading
 import tiktoken
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
 
 from factcheck.utils.llmclient import CLIENTS, model2client
 from factcheck.utils.prompt import prompt_mapper
 from factcheck.utils.logger import CustomLogger
 from factcheck.utils.api_config import load_api_config
+from factcheck.utils.config_loader import config
+from factcheck.utils.event_loop import run_coroutine
 from factcheck.utils.data_class import PipelineUsage, FactCheckOutput, ClaimDetail, FCSummary
 from factcheck.utils.graph_utils import sag_to_graph, get_claims_from_graph, graph_to_networkx_dict 
 
@@ -25,6 +30,21 @@ from factcheck.core.KnowledgeBase import FactKnowledgeBase
 
 logger = CustomLogger(__name__).getlog()
 
+_STREAM_DONE = object()
+# How often blocked stream workers wake up to check for cancellation, in seconds.
+_STREAM_POLL_INTERVAL = 0.1
+
+
+def _stream_put(stage_queue: queue.Queue, item, cancelled: threading.Event) -> bool:
+    """Puts `item` on a (bounded) stage queue, giving up once the stream is cancelled. Returns whether it was queued."""
+    while True:
+        try:
+            stage_queue.put(item, timeout=_STREAM_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            if cancelled.is_set():
+                return False
+
 
 class FactCheck:
     """
@@ -46,6 +66,12 @@ class FactCheck:
         prompt_handler,
         encoding=None,
         num_seed_retries: int = 3,
+        streaming: bool = False,
+        stream_queue_size: int = 4,
+        stream_workers: dict = None,
+        stream_batch_size: int = 5,
+        background_reverify: bool = False,
+        reverify_components: dict = None,
     ):
         self.metadata_analyzer = metadata_analyzer
         self.stylometry_analyzer = stylometry_analyzer
@@ -62,6 +88,12 @@ class FactCheck:
         self.prompt = prompt_handler
         
         self.num_seed_retries = num_seed_retries
+        self.streaming = streaming
+        self.stream_queue_size = stream_queue_size
+        self.stream_workers = {"query": 4, "retrieve": 2, "verify": 2}
+        if stream_workers:
+            self.stream_workers.update(stream_workers)
+        self.stream_batch_size = max(1, stream_batch_size)
         self.encoding = encoding if encoding else tiktoken.get_encoding("cl100k_base")
 
         self.llm_components = {
@@ -72,6 +104,16 @@ class FactCheck:
             "claimverify": self.claimverify
         }
 
+        # Re-verification runs next to foreground requests, so it needs components whose LLM clients
+        # count tokens separately; sharing them would bill its usage to whichever request is running.
+        self.background_executor = None
+        self.reverify_components = reverify_components
+        if background_reverify and not reverify_components:
+            logger.warning("Background re-verification disabled: no separate re-verification components were given.")
+        elif background_reverify:
+            self.background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kb-reverify")
+            self.knowledge_base.set_revalidator(self._reverify_in_background)
+
         logger.info("=== FactCheck Core Initialized (DI Mode) ===")
 
     def _get_usage(self) -> PipelineUsage:
@@ -90,10 +132,11 @@ class FactCheck:
         )
 
     def _reset_usage(self):
-        """Reset token counters for a new request."""
+        """Reset token counters and council stats for a new request."""
         for component in self.llm_components.values():
             if hasattr(component, 'llm_client'):
                 component.llm_client.reset_usage()
+        self.claimverify.reset_council_stats()
 
     def _screen_input(self, raw_text: str):
         logger.info("--- Running Layer 0: Rapid Screening ---")
@@ -204,7 +247,8 @@ class FactCheck:
             return "Failed to generate comprehensive report due to an unexpected error."
 
     def _finalize_factcheck(
-        self, raw_text: str, sag: dict = None, claim_detail: list[ClaimDetail] = None, return_dict: bool = True, summary_override: dict = None
+        self, raw_text: str, sag: dict = None, claim_detail: list[ClaimDetail] = None, return_dict: bool = True, summary_override: dict = None,
+        learn: bool = True
     ) -> FactCheckOutput:
 
         if summary_override:
@@ -238,7 +282,8 @@ class FactCheck:
         
         output = FactCheckOutput(
             raw_text=raw_text, token_count=num_tokens,
-            usage=self._get_usage(), claim_detail=claim_detail, summary=summary,
+            usage=self._get_usage(), council_stats=self.claimverify.get_council_stats(),
+            claim_detail=claim_detail, summary=summary,
             final_report=final_report_markdown
         )
 
@@ -248,7 +293,8 @@ class FactCheck:
         output_dict['sag'] = sag or {"nodes": [], "edges": []}
         output_dict['final_report'] = final_report_markdown
 
-        self.screening_advisor.learn_from_result(raw_text, output_dict)
+        if learn:
+            self.screening_advisor.learn_from_result(raw_text, output_dict)
 
         if return_dict:
             return output_dict
@@ -256,20 +302,276 @@ class FactCheck:
             output.sag = sag or {"nodes": [], "edges": []} 
             return output
         
+    @staticmethod
+    def _verification_status(evidences: list) -> str:
+        labels = [e.relationship for e in evidences]
+        if "REFUTES" in labels:
+            return "REFUTED"
+        elif "SUPPORTS" in labels:
+            return "SUPPORTED"
+        return "INCONCLUSIVE"
+
+    def _verify_claims_staged(self, claims_to_process: list, claims_from_nodes: list, progress_callback, components: dict = None):
+        components = components or self.llm_components
+        progress_callback('PROGRESS', f'Step 3/5: Generating search queries for {len(claims_to_process)} new claims...')
+        claim_queries_dict = components["query_generator"].generate_query(claims=claims_to_process)
+
+        progress_callback('PROGRESS', 'Step 4/5: Retrieving evidence (Deep Search)...')
+        claim_evidences_dict = components["evidence_crawler"].retrieve_evidence(claim_queries_dict=claim_queries_dict)
+
+        progress_callback('PROGRESS', 'Step 5/5: Verifying claims with AI council...')
+
+        claim_verifications_dict = {}
+        batch_size = 5
+        for i in range(0, len(claims_to_process), batch_size):
+            batch_claims = claims_to_process[i : i + batch_size]
+            batch_evidence_input = {k: claim_evidences_dict[k] for k in batch_claims if k in claim_evidences_dict}
+
+            if not batch_evidence_input:
+                continue
+
+            batch_result = components["claimverify"].verify_claims(batch_evidence_input)
+            claim_verifications_dict.update(batch_result)
+
+            verified_updates = []
+            for claim_txt, evidences in batch_result.items():
+                c_id = claims_from_nodes.index(claim_txt) + 1 if claim_txt in claims_from_nodes else -1
+                verified_updates.append({"id": c_id, "status": self._verification_status(evidences)})
+
+            progress_callback('PROGRESS', f'Verified {min(i + batch_size, len(claims_to_process))}/{len(claims_to_process)} new claims...', {
+                "event": "BATCH_DONE",
+                "updates": verified_updates
+            })
+        return claim_queries_dict, claim_verifications_dict
+
+    def _reverify_in_background(self, stale_claims: dict):
+        self.background_executor.submit(self._reverify_claims, stale_claims)
+
+    def _reverify_claims(self, stale_claims: dict):
+        """Re-runs verification for Knowledge Base hits past their freshness window and replaces their entries."""
+        def no_op_callback(state, message, payload=None):
+            pass
+
+        claims = list(stale_claims.keys())
+        try:
+            logger.info(f"Background re-verification of {len(claims)} stale claims started.")
+            claim_queries_dict, claim_verifications_dict = self._verify_claims_staged(
+                claims, claims, no_op_callback, components=self.reverify_components
+            )
+            claim_details = self._merge_claim_details(
+                original_claims=claims,
+                claim2checkworthy={claim: "Re-verified after the Knowledge Base entry went stale." for claim in claims},
+                claim2queries=claim_queries_dict,
+                claim2verifications=claim_verifications_dict,
+            )
+            self.knowledge_base.save_knowledge_batch(
+                claim_details, doc_ids=[stale_claims[detail.claim] for detail in claim_details], background=False
+            )
+            logger.info(f"Background re-verification of {len(claims)} stale claims done.")
+        except Exception as e:
+            logger.error(f"Background re-verification failed: {e}")
+        finally:
+            self.knowledge_base.finish_revalidation(stale_claims.values())
+            for name, component in self.reverify_components.items():
+                if hasattr(component, 'llm_client'):
+                    usage = component.llm_client.usage
+                    logger.info(f"Re-verification usage [{name}]: {usage.prompt_tokens} prompt / {usage.completion_tokens} completion tokens.")
+                    component.llm_client.reset_usage()
+
+    def _start_stream_stage(
+        self, name: str, handler, in_queue: queue.Queue, out_queue: queue.Queue, num_workers: int, max_batch: int = 1,
+        cancelled: threading.Event = None,
+    ):
+        """
+        Runs `handler` on the items of `in_queue` and forwards (claim, result) pairs downstream.
+        A worker also takes up to `max_batch - 1` items that are already waiting, so the handler
+        receives a list of (claim, payload) pairs and returns a {claim: result} dict.
+        Once `cancelled` is set, remaining items are dropped instead of processed.
+        """
+        num_workers = max(1, num_workers)
+        remaining = [num_workers]
+        lock = threading.Lock()
+        cancelled = cancelled or threading.Event()
+
+        def worker():
+            finished = False
+            try:
+                while not finished:
+                    try:
+                        item = in_queue.get(timeout=_STREAM_POLL_INTERVAL)
+                    except queue.Empty:
+                        if cancelled.is_set():
+                            break
+                        continue
+                    if item is _STREAM_DONE:
+                        _stream_put(in_queue, _STREAM_DONE, cancelled)
+                        break
+                    items = [item]
+                    while len(items) < max_batch:
+                        try:
+                            item = in_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if item is _STREAM_DONE:
+                            _stream_put(in_queue, _STREAM_DONE, cancelled)
+                            finished = True
+                            break
+                        items.append(item)
+
+                    if cancelled.is_set():
+                        continue
+                    results = handler(items)
+                    for claim, _ in items:
+                        if not _stream_put(out_queue, (claim, results[claim]), cancelled):
+                            finished = True
+                            break
+            finally:
+                # Every worker signals on its way out, so downstream stages see the end even after a failure.
+                with lock:
+                    remaining[0] -= 1
+                    if remaining[0] == 0:
+                        _stream_put(out_queue, _STREAM_DONE, cancelled)
+
+        threads = []
+        for i in range(num_workers):
+            thread = threading.Thread(target=worker, name=f"factcheck-{name}-{i}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        return threads
+
+    def _verify_claims_streaming(self, claims_to_process: list, claims_from_nodes: list, progress_callback):
+        """
+        Moves every claim through QueryGenerator -> retriever -> ClaimVerify on its own,
+        with bounded queues between the stages, so verdicts are reported while other
+        claims are still being searched.
+        """
+        progress_callback('PROGRESS', f'Step 3-5/5: Streaming {len(claims_to_process)} new claims through search and verification...')
+
+        claim_queries_dict = {}
+        claim_verifications_dict = {}
+
+        def generate_queries(items):
+            claims = [claim for claim, _ in items]
+            try:
+                queries_dict = self.query_generator.generate_query(claims=claims)
+            except Exception as e:
+                logger.error(f"Streaming query generation failed for {len(claims)} claims: {e}")
+                queries_dict = {}
+            for claim in claims:
+                claim_queries_dict[claim] = queries_dict.get(claim, [claim])
+            return {claim: claim_queries_dict[claim] for claim in claims}
+
+        def retrieve_evidence(items):
+            try:
+                # Retrievers with an async path search on the shared event loop; the worker only waits for the batch.
+                if hasattr(self.evidence_crawler, "aretrieve_evidence"):
+                    evidences_dict = run_coroutine(self.evidence_crawler.aretrieve_evidence(claim_queries_dict=dict(items)))
+                else:
+                    evidences_dict = self.evidence_crawler.retrieve_evidence(claim_queries_dict=dict(items))
+            except Exception as e:
+                logger.error(f"Streaming evidence retrieval failed for {len(items)} claims: {e}")
+                evidences_dict = {}
+            return {claim: evidences_dict.get(claim, []) for claim, _ in items}
+
+        def verify_claims(items):
+            try:
+                verifications_dict = self.claimverify.verify_claims(dict(items))
+            except Exception as e:
+                logger.error(f"Streaming verification failed for {len(items)} claims: {e}")
+                verifications_dict = {}
+            return {claim: verifications_dict.get(claim, []) for claim, _ in items}
+
+        claim_queue = queue.Queue()
+        query_queue = queue.Queue(maxsize=self.stream_queue_size)
+        evidence_queue = queue.Queue(maxsize=self.stream_queue_size)
+        result_queue = queue.Queue()
+
+        for claim in claims_to_process:
+            claim_queue.put((claim, None))
+        claim_queue.put(_STREAM_DONE)
+
+        cancelled = threading.Event()
+        # Search stages take whatever is already queued (up to stream_batch_size), so claims that arrive
+        # together still share QueryGenerator and Serper requests.
+        self._start_stream_stage(
+            "query", generate_queries, claim_queue, query_queue, self.stream_workers["query"],
+            max_batch=self.stream_batch_size, cancelled=cancelled,
+        )
+        self._start_stream_stage(
+            "retrieve", retrieve_evidence, query_queue, evidence_queue, self.stream_workers["retrieve"],
+            max_batch=self.stream_batch_size, cancelled=cancelled,
+        )
+        self._start_stream_stage(
+            "verify", verify_claims, evidence_queue, result_queue, self.stream_workers["verify"],
+            max_batch=getattr(self.claimverify, "claims_per_request", 1), cancelled=cancelled,
+        )
+
+        num_done = 0
+        finished = False
+        try:
+            while True:
+                item = result_queue.get()
+                if item is _STREAM_DONE:
+                    finished = True
+                    break
+                claim, evidences = item
+                claim_verifications_dict[claim] = evidences
+                num_done += 1
+
+                c_id = claims_from_nodes.index(claim) + 1 if claim in claims_from_nodes else -1
+                progress_callback('PROGRESS', f'Verified {num_done}/{len(claims_to_process)} new claims...', {
+                    "event": "BATCH_DONE",
+                    "updates": [{"id": c_id, "status": self._verification_status(evidences)}]
+                })
+        finally:
+            if not finished:
+                # The caller gave up (e.g. the progress callback raised): let the stages drop what is left,
+                # and drain the queues so no worker stays blocked on a full one.
+                cancelled.set()
+                for stage_queue in (claim_queue, query_queue, evidence_queue):
+                    self._drain_queue(stage_queue)
+        return claim_queries_dict, claim_verifications_dict
+
+    @staticmethod
+    def _drain_queue(stage_queue: queue.Queue):
+        """Discards the queued claims, keeping the end marker so the stage's workers still shut down."""
+        saw_done = False
+        while True:
+            try:
+                item = stage_queue.get_nowait()
+            except queue.Empty:
+                break
+            saw_done = saw_done or item is _STREAM_DONE
+        if saw_done:
+            stage_queue.put(_STREAM_DONE)
+
     def check_text_with_progress(self, raw_text: str, progress_callback):
         self._reset_usage()
 
         progress_callback('PROGRESS', 'Step 1/5: Screening for obvious misinformation...')
         logger.info("--- Running Layer 0: Rapid Screening ---")
     
-        advice = self.screening_advisor.get_advice(raw_text)
-        logger.info("Screening Advisor's advice: '%s'", advice)
-
         should_exit, screen_result = self._screen_input(raw_text)
         if should_exit:
             progress_callback('SUCCESS', 'Screening complete. Early exit triggered.')
             return screen_result
 
+        advice = self.screening_advisor.get_advice(raw_text)
+        logger.info("Screening Advisor's advice: %s", advice)
+        if self.screening_advisor.should_skip(advice):
+            message = (
+                f"Skipped: the text reads as '{advice['label']}' (screening confidence {advice['confidence']:.2f} "
+                f"from {advice['neighbours']} similar texts), so no claims were checked."
+            )
+            logger.info(f"Routing exit: {message}")
+            progress_callback('SUCCESS', 'Screening complete. No checkable claims expected.')
+            # Routed results are not learned from, or the advisor would keep reinforcing its own votes.
+            routed_output = self._finalize_factcheck(
+                raw_text=raw_text, claim_detail=[], summary_override={"message": message, "status": "ROUTED"}, learn=False
+            )
+            routed_output['screening'] = advice
+            return routed_output
+
         progress_callback('PROGRESS', 'Step 2/5: Decomposing text into claims...')
         logger.info("--- Layer 0 passed. Proceeding with full pipeline. ---")
         st_time = time.time()
@@ -282,6 +584,7 @@ class FactCheck:
             doc=resolved_text, 
             num_retries=self.num_seed_retries
         )
+        decomposition_failed = bool(sag_jsonld.pop("failed", False))
 
         sag_graph = sag_to_graph(sag_jsonld)
         extracted_claims_info = get_claims_from_graph(sag_graph)
@@ -291,7 +594,10 @@ class FactCheck:
         if not claims_from_nodes:
             logger.warning("SAG decomposition did not return any verifiable claims.")
             progress_callback('SUCCESS', 'Analysis complete. No verifiable claims found.')
-            return self._finalize_factcheck(raw_text=raw_text, sag=sag_dict_for_output, claim_detail=[], return_dict=True)
+            # An empty graph after an LLM failure says nothing about the text; do not teach the advisor "no_claims".
+            return self._finalize_factcheck(
+                raw_text=raw_text, sag=sag_dict_for_output, claim_detail=[], return_dict=True, learn=not decomposition_failed
+            )
 
         original_count = len(claims_from_nodes)
         claims_from_nodes = self.decomposer.deduplicate_claims(claims_from_nodes, threshold=0.85)
@@ -330,8 +636,9 @@ class FactCheck:
         claims_to_process = []
         cached_results_map = {} 
 
+        cached_details = self.knowledge_base.check_cache_batch(checkworthy_claims)
         for claim in checkworthy_claims:
-            cached_detail = self.knowledge_base.check_cache(claim)
+            cached_detail = cached_details.get(claim)
             if cached_detail:
                 cached_results_map[claim] = cached_detail
                 c_id = claims_from_nodes.index(claim) + 1 if claim in claims_from_nodes else 0
@@ -349,49 +656,17 @@ class FactCheck:
         new_claim_queries_dict = {}
 
         if claims_to_process:
-            progress_callback('PROGRESS', f'Step 3/5: Generating search queries for {len(claims_to_process)} new claims...')
-            new_claim_queries_dict = self.query_generator.generate_query(claims=claims_to_process)
-            
-            progress_callback('PROGRESS', 'Step 4/5: Retrieving evidence (Deep Search)...')
-            new_claim_evidences_dict = self.evidence_crawler.retrieve_evidence(claim_queries_dict=new_claim_queries_dict)
-            
-            progress_callback('PROGRESS', 'Step 5/5: Verifying claims with AI council...')
-            
-            batch_size = 5
-            for i in range(0, len(claims_to_process), batch_size):
-                batch_claims = claims_to_process[i : i + batch_size]
-                batch_evidence_input = {k: new_claim_evidences_dict[k] for k in batch_claims if k in new_claim_evidences_dict}
-                
-                if not batch_evidence_input: 
-                    continue
-
-                batch_result = self.claimverify.verify_claims(batch_evidence_input)
-                new_claim_verifications_dict.update(batch_result)
-                
-                verified_updates = []
-                for claim_txt, evidences in batch_result.items():
-                    c_id = -1
-                    if claim_txt in claims_from_nodes:
-                        c_id = claims_from_nodes.index(claim_txt) + 1
-                    
-                    labels = [e.relationship for e in evidences]
-                    if "REFUTES" in labels: 
-                        status = "REFUTED"
-                    elif "SUPPORTS" in labels: 
-                        status = "SUPPORTED"
-                    else: 
-                        status = "INCONCLUSIVE"
-                    
-                    verified_updates.append({"id": c_id, "status": status})
-
-                progress_callback('PROGRESS', f'Verified {min(i + batch_size, len(claims_to_process))}/{len(claims_to_process)} new claims...', {
-                    "event": "BATCH_DONE",
-                    "updates": verified_updates
-                })
-            step5_time = time.time()
+            if self.streaming:
+                new_claim_queries_dict, new_claim_verifications_dict = self._verify_claims_streaming(
+                    claims_to_process, claims_from_nodes, progress_callback
+                )
+            else:
+                new_claim_queries_dict, new_claim_verifications_dict = self._verify_claims_staged(
+                    claims_to_process, claims_from_nodes, progress_callback
+                )
         else:
             logger.info("All claims resolved from Cache.")
-            step5_time = time.time()
+        step5_time = time.time()
 
         logger.info(
             "== State: Done! \n Total time: %.2fs.",
@@ -407,8 +682,11 @@ class FactCheck:
             claim2verifications=new_claim_verifications_dict,
         )
 
-        for detail in new_claim_details_objects:
-            self.knowledge_base.save_knowledge(detail)
+        self.knowledge_base.save_knowledge_batch(new_claim_details_objects)
+        # A claim that came back without evidences means search failed or returned nothing (outage, empty Serper batch).
+        retrieval_failed = any(not new_claim_verifications_dict.get(claim) for claim in claims_to_process)
+        if retrieval_failed:
+            logger.info("Some claims got no evidences; this result is not used for screening lessons.")
 
         final_claim_details = []
         
@@ -439,7 +717,10 @@ class FactCheck:
             if not found:
                 logger.warning(f"Claim '{original_claim}' was lost during processing.")
 
-        return self._finalize_factcheck(raw_text=raw_text, sag=sag_dict_for_output, claim_detail=final_claim_details, return_dict=True)
+        return self._finalize_factcheck(
+            raw_text=raw_text, sag=sag_dict_for_output, claim_detail=final_claim_details, return_dict=True,
+            learn=not (decomposition_failed or retrieval_failed)
+        )
     
     def check_text(self, raw_text: str):
         def no_op_callback(state, message, payload=None):
@@ -497,9 +778,36 @@ def build_fact_check_system(
         api_config=final_api_config
     )
     
-    claimverify = ClaimVerify(llm_client=clients['claim_verify_model'], prompt=prompt)
+    claimverify = ClaimVerify(
+        llm_client=clients['claim_verify_model'],
+        prompt=prompt,
+        claims_per_request=config.get('verification.claims_per_request', 1),
+        adaptive_council=config.get('verification.adaptive_council', False),
+        skeptic_trust_threshold=config.get('verification.skeptic_trust_threshold', 0.5),
+    )
     knowledge_base = FactKnowledgeBase()
 
+    background_reverify = config.get('knowledge_base.background_reverify', False)
+    reverify_components = None
+    if background_reverify:
+        # Same clients (keys, rate limits, response cache) with their own token counters.
+        reverify_components = {
+            "query_generator": QueryGenerator(llm_client=clients['query_generator_model'].with_own_usage(), prompt=prompt),
+            "evidence_crawler": RetrieverClass(
+                llm_client=clients['evidence_retrieval_model'].with_own_usage(),
+                api_config=final_api_config
+            ),
+            "claimverify": ClaimVerify(
+                llm_client=clients['claim_verify_model'].with_own_usage(),
+                prompt=prompt,
+                claims_per_request=claimverify.claims_per_request,
+                adaptive_council=claimverify.adaptive_council,
+                skeptic_trust_threshold=claimverify.skeptic_trust_threshold,
+            ),
+        }
+
+    streaming_config = config.get('pipeline.streaming', {})
+
     return FactCheck(
         metadata_analyzer=metadata_analyzer,
         stylometry_analyzer=stylometry_analyzer,
@@ -511,5 +819,11 @@ def build_fact_check_system(
         evidence_crawler=evidence_crawler,
         claimverify=claimverify,
         knowledge_base=knowledge_base,
-        prompt_handler=prompt
+        prompt_handler=prompt,
+        streaming=streaming_config.get('enabled', False),
+        stream_queue_size=streaming_config.get('queue_size', 4),
+        stream_workers=streaming_config.get('workers'),
+        stream_batch_size=streaming_config.get('batch_size', 5),
+        background_reverify=background_reverify,
+        reverify_components=reverify_components,
     )
\ No newline at end of file
@@ -2,95 +2,242 @@
 
 from __future__ import annotations
 import json
+import threading
 from collections import Counter
 from factcheck.utils.logger import CustomLogger
 from factcheck.utils.data_class import Evidence
 
 logger = CustomLogger(__name__).getlog()
 
+COUNCIL_ROLES = ["Logician", "Researcher", "Skeptic"]
+FIRST_ROUND_ROLES = ["Logician", "Researcher"]
+TIEBREAK_ROLE = "Skeptic"
+
 
 class ClaimVerify:
-    def __init__(self, llm_client, prompt):
+    def __init__(
+        self,
+        llm_client,
+        prompt,
+        claims_per_request: int = 1,
+        adaptive_council: bool = False,
+        skeptic_trust_threshold: float = 0.5,
+    ):
         self.llm_client = llm_client
         self.prompt = prompt
+        self.claims_per_request = max(1, claims_per_request)
+        if self.claims_per_request > 1 and not self._supports_batching():
+            # Without role briefs a group would go out as a single-claim prompt, fail to parse and be re-sent.
+            logger.warning(f"Prompt '{type(prompt).__name__}' has no batched council prompts; verifying one claim per request.")
+            self.claims_per_request = 1
+        self.adaptive_council = adaptive_council
+        self.skeptic_trust_threshold = skeptic_trust_threshold
+        self.council_stats = Counter()
+        # The streaming verify stage runs several workers against this instance.
+        self._stats_lock = threading.Lock()
+
+    def get_council_stats(self) -> dict:
+        """Role evaluations (one role judging one claim) made and skipped by the adaptive council."""
+        with self._stats_lock:
+            stats = dict(self.council_stats)
+        full_cost = stats.get("claims", 0) * len(COUNCIL_ROLES)
+        stats["evaluations_saved_ratio"] = 1 - stats.get("evaluations", 0) / full_cost if full_cost else 0.0
+        return stats
+
+    def reset_council_stats(self):
+        with self._stats_lock:
+            self.council_stats.clear()
+
+    def _record_stats(self, counts: Counter):
+        with self._stats_lock:
+            self.council_stats.update(counts)
+
+    def _supports_batching(self) -> bool:
+        return hasattr(self.prompt, "batch_verify_prompt") and all(
+            getattr(self.prompt, f"{role.lower()}_role_prompt", None) for role in COUNCIL_ROLES
+        )
+
+    def _role_prompts(self, role: str) -> tuple[str, str]:
+        """Returns the single-claim prompt and the role brief used in batched prompts."""
+        key = role.lower()
+        return getattr(self.prompt, f"{key}_prompt"), getattr(self.prompt, f"{key}_role_prompt", None)
+
+    @staticmethod
+    def _clean_evidences(evidences: list[dict]) -> list[dict]:
+        return [
+            {
+                "id": f"E{j + 1}",
+                "text": evi.get('text', '')[:1000],
+                "trust_level": evi.get('trust_level', 'unknown')
+            }
+            for j, evi in enumerate(evidences)
+        ]
+
+    def _build_request(self, role: str, group: list[str], claim_evidences_dict: dict) -> str:
+        single_prompt, role_prompt = self._role_prompts(role)
+        if len(group) == 1:
+            claim = group[0]
+            evidences_json_str = json.dumps(self._clean_evidences(claim_evidences_dict[claim]))
+            return single_prompt.format(claim=claim, evidences_json=evidences_json_str)
+
+        claims_data = [
+            {"claim_id": f"C{k + 1}", "claim": claim, "evidences": self._clean_evidences(claim_evidences_dict[claim])}
+            for k, claim in enumerate(group)
+        ]
+        return self.prompt.batch_verify_prompt.format(role_prompt=role_prompt, claims_json=json.dumps(claims_data))
+
+    @staticmethod
+    def _parse_opinions(response: str, role: str, group: list[str]) -> dict | None:
+        """
+        Parses one council response into {claim: {evidence_id: [opinion]}}.
+        Returns None for a batched response that is unparsable or skips a claim, so the batch can be split.
+        """
+        try:
+            data = json.loads(response) if response else {}
+        except json.JSONDecodeError:
+            data = None
+        if not isinstance(data, dict):
+            return None
+
+        parsed = {claim: {} for claim in group}
+        for v in data.get("verifications", []):
+            e_id = v.get("id")
+            if not e_id:
+                continue
+            if len(group) == 1:
+                claim = group[0]
+            else:
+                claim_idx = str(v.get("claim_id", "")).lstrip("C")
+                if not claim_idx.isdigit() or not 0 < int(claim_idx) <= len(group):
+                    continue
+                claim = group[int(claim_idx) - 1]
+
+            parsed[claim].setdefault(e_id, []).append({
+                "role": role,
+                "relationship": v.get("relationship", "IRRELEVANT").upper(),
+                "reasoning": v.get("reasoning", "No reasoning provided.")
+            })
+
+        if len(group) > 1 and not all(parsed.values()):
+            return None
+        return parsed
+
+    def _collect_opinions(self, batch_claims: list[str], claim_evidences_dict: dict, roles: list[str]) -> dict:
+        """
+        Asks every role about every claim, packing up to `claims_per_request` claims into one request per role.
+        A batched request whose response fails to parse is split in half and sent again.
+        """
+        results_by_claim = {c: {} for c in batch_claims}
+        pending = [
+            (role, batch_claims[i : i + self.claims_per_request])
+            for role in roles
+            for i in range(0, len(batch_claims), self.claims_per_request)
+        ]
+
+        while pending:
+            next_pending = []
+            for schema_type, requests in (
+                ("verification", [r for r in pending if len(r[1]) == 1]),
+                ("batch_verification", [r for r in pending if len(r[1]) > 1]),
+            ):
+                if not requests:
+                    continue
+                logger.info(f"Council is debating... Sending {len(requests)} requests ({schema_type}).")
+                prompts = [self._build_request(role, group, claim_evidences_dict) for role, group in requests]
+                messages_list = self.llm_client.construct_message_list(prompts)
+                responses = self.llm_client.multi_call(messages_list, num_retries=3, schema_type=schema_type)
+
+                for (role, group), messages, response in zip(requests, messages_list, responses):
+                    parsed = self._parse_opinions(response, role, group)
+                    if parsed is None:
+                        # Do not let a retry (or the next request for the same claims) replay the unusable answer.
+                        self.llm_client.forget(messages, schema_type=schema_type)
+                    if parsed is None and len(group) > 1:
+                        logger.warning(f"Agent {role} returned an unusable batch for {len(group)} claims. Splitting the batch.")
+                        middle = len(group) // 2
+                        next_pending.extend([(role, group[:middle]), (role, group[middle:])])
+                        continue
+                    if parsed is None:
+                        logger.warning(f"Agent {role} failed parse on claim '{group[0][:20]}...'")
+                        continue
+                    for claim, opinions in parsed.items():
+                        for e_id, ops in opinions.items():
+                            results_by_claim[claim].setdefault(e_id, []).extend(ops)
+            pending = next_pending
+        return results_by_claim
+
+    def _skeptic_reason(self, opinions_by_evidence: dict, evidences: list[dict]) -> str | None:
+        """Returns why the Skeptic must be consulted for a claim, or None when the first round settled it."""
+        for j in range(len(evidences)):
+            opinions = opinions_by_evidence.get(f"E{j + 1}", [])
+            if len(opinions) < len(FIRST_ROUND_ROLES):
+                return "missing_vote"
+            if len({op["relationship"] for op in opinions}) > 1:
+                return "disagreement"
+
+        untrusted = sum(1 for evi in evidences if evi.get("trust_level", "unknown") != "high")
+        if untrusted / len(evidences) > self.skeptic_trust_threshold:
+            return "trust_mix"
+        return None
+
+    def _collect_opinions_adaptive(self, batch_claims: list[str], claim_evidences_dict: dict) -> dict:
+        """
+        Runs the Logician and Researcher first and calls the Skeptic only for claims where they
+        disagree on any evidence, or where too little of the evidence comes from high-trust sources.
+        """
+        results_by_claim = self._collect_opinions(batch_claims, claim_evidences_dict, FIRST_ROUND_ROLES)
+
+        tiebreak_claims = []
+        counts = Counter()
+        for claim in batch_claims:
+            reason = self._skeptic_reason(results_by_claim[claim], claim_evidences_dict[claim])
+            if reason:
+                tiebreak_claims.append(claim)
+                counts[f"skeptic_{reason}"] += 1
+            else:
+                counts["skeptic_skipped"] += 1
+
+        if tiebreak_claims:
+            tiebreak_results = self._collect_opinions(tiebreak_claims, claim_evidences_dict, [TIEBREAK_ROLE])
+            for claim, opinions in tiebreak_results.items():
+                for e_id, ops in opinions.items():
+                    results_by_claim[claim].setdefault(e_id, []).extend(ops)
+
+        counts["claims"] += len(batch_claims)
+        counts["evaluations"] += len(batch_claims) * len(FIRST_ROUND_ROLES) + len(tiebreak_claims)
+        self._record_stats(counts)
+        logger.info(
+            f"Adaptive council: Skeptic consulted for {len(tiebreak_claims)}/{len(batch_claims)} claims "
+            f"({len(batch_claims) - len(tiebreak_claims)} role evaluations saved)."
+        )
+        return results_by_claim
 
     def verify_claims(self, claim_evidences_dict, batch_size: int = 5) -> dict[str, list[Evidence]]:
         claims_to_verify = [claim for claim, evidences in claim_evidences_dict.items() if evidences]
         if not claims_to_verify:
             return {k: [] for k in claim_evidences_dict.keys()}
-        
+
         logger.info(f"Starting COUNCIL verification for {len(claims_to_verify)} claims.")
         final_verifications_dict = {k: [] for k in claim_evidences_dict.keys()}
-        
+
         for i in range(0, len(claims_to_verify), batch_size):
             batch_claims = claims_to_verify[i : i + batch_size]
             logger.info(f"Processing verification batch {i//batch_size + 1}: {len(batch_claims)} claims.")
 
-            all_prompts = []
-            meta_map = []  
-            for claim in batch_claims:
-                evidences = claim_evidences_dict[claim]
-                
-                evidences_clean = [
-                    {
-                        "id": f"E{j + 1}", 
-                        "text": evi.get('text', '')[:1000],  
-                        "trust_level": evi.get('trust_level', 'unknown')
-                    } 
-                    for j, evi in enumerate(evidences)
-                ]
-                evidences_json_str = json.dumps(evidences_clean)
-                roles = [
-                    ("Logician", self.prompt.logician_prompt),
-                    ("Researcher", self.prompt.researcher_prompt),
-                    ("Skeptic", self.prompt.skeptic_prompt)
-                ]
-                for role_name, role_template in roles:
-                    user_input = role_template.format(claim=claim, evidences_json=evidences_json_str)
-                    all_prompts.append(user_input)
-                    meta_map.append({"claim": claim, "role": role_name})
-            logger.info(f"Council is debating... Sending {len(all_prompts)} requests.")
-            messages_list = self.llm_client.construct_message_list(all_prompts)
-            
-            responses = self.llm_client.multi_call(
-                messages_list, 
-                num_retries=3,
-                schema_type="verification" 
-            )
-            results_by_claim = {c: {} for c in batch_claims}
-            for idx, response in enumerate(responses):
-                meta = meta_map[idx]
-                claim = meta['claim']
-                role = meta['role']
-                try:
-                    if response:
-                        data = json.loads(response)
-                        verifications = data.get("verifications", [])
-                        
-                        for v in verifications:
-                            e_id = v.get("id")
-                            if not e_id: 
-                                continue
-                            
-                            if e_id not in results_by_claim[claim]:
-                                results_by_claim[claim][e_id] = []
-                            
-                            results_by_claim[claim][e_id].append({
-                                "role": role,
-                                "relationship": v.get("relationship", "IRRELEVANT").upper(),
-                                "reasoning": v.get("reasoning", "No reasoning provided.")
-                            })
-                except Exception as e:
-                    logger.warning(f"Agent {role} failed parse on claim '{claim[:20]}...': {e}")
+            if self.adaptive_council:
+                results_by_claim = self._collect_opinions_adaptive(batch_claims, claim_evidences_dict)
+            else:
+                results_by_claim = self._collect_opinions(batch_claims, claim_evidences_dict, COUNCIL_ROLES)
+                self._record_stats(Counter(claims=len(batch_claims), evaluations=len(batch_claims) * len(COUNCIL_ROLES)))
 
             for claim in batch_claims:
                 original_evidences = claim_evidences_dict[claim]
                 final_evidence_objs = []
-                
+
                 for j, evi_orig in enumerate(original_evidences):
                     e_id = f"E{j + 1}"
                     opinions = results_by_claim[claim].get(e_id, [])
-                    
+
                     if not opinions:
                         final_obj = Evidence(
                             claim=claim, text=evi_orig.get('text'), url=evi_orig.get('url'),
@@ -101,14 +248,15 @@ class ClaimVerify:
                         vote_counts = Counter(votes)
                         final_relationship = vote_counts.most_common(1)[0][0]
                         combined_reasoning = " || ".join([f"[{op['role']}]: {op['reasoning']}" for op in opinions])
-                        
+
                         final_obj = Evidence(
                             claim=claim,
                             text=evi_orig.get('text', ''),
                             url=evi_orig.get('url', 'N/A'),
                             relationship=final_relationship,
-                            reasoning=combined_reasoning
+                            reasoning=combined_reasoning,
+                            votes={op['role']: op['relationship'] for op in opinions}
                         )
                     final_evidence_objs.append(final_obj)
                 final_verifications_dict[claim] = final_evidence_objs
-        return final_verifications_dict
\ No newline at end of file
+        return final_verifications_dict
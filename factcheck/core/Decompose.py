@@ -5,7 +5,8 @@ import nltk
 import json
 import networkx as nx
 from factcheck.utils.graph_utils import sag_to_graph, graph_to_networkx_dict
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import util
+from factcheck.utils.embedding_service import get_embedding_model
 
 logger = CustomLogger(__name__).getlog()
 
@@ -17,7 +18,7 @@ class Decompose:
 
         logger.info("Loading deduplication model (all-MiniLM-L6-v2)...")
         try:
-            self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+            self.embedder = get_embedding_model('all-MiniLM-L6-v2')
         except Exception as e:
             logger.error(f"Failed to load sentence-transformers: {e}. Deduplication will be skipped.")
             self.embedder = None
@@ -55,18 +56,21 @@ class Decompose:
                     return response_dict
                 else:
                     logger.warning(f"Response is valid but missing '@graph' key.")
+                    self.llm_client.forget(messages[0], seed=42 + i)
 
             except (json.JSONDecodeError, TypeError) as e:
-                logger.error(f"Failed to process LLM response for SAG. Error: {e}")     
+                logger.error(f"Failed to process LLM response for SAG. Error: {e}")
+                self.llm_client.forget(messages[0], seed=42 + i)     
         logger.warning("Failed to create SAG after multiple retries. Returning an empty graph.")
-        return {"@context": "https://failsafe.factcheck.ai/ontology#", "@graph": []}
+        # Marked so callers can tell a failed decomposition from a text without claims.
+        return {"@context": "https://failsafe.factcheck.ai/ontology#", "@graph": [], "failed": True}
     
     def deduplicate_claims(self, claims: list[str], threshold: float = 0.85) -> list[str]:
         if not claims or len(claims) < 2 or self.embedder is None:
             return claims
 
         logger.info(f"Deduplicating {len(claims)} claims with threshold {threshold}...")
-        embeddings = self.embedder.encode(claims, convert_to_tensor=True)
+        embeddings = self.embedder.encode(claims)
         cosine_scores = util.cos_sim(embeddings, embeddings)
         sorted_indices = sorted(range(len(claims)), key=lambda k: len(claims[k]), reverse=True)
         
@@ -134,6 +138,7 @@ class Decompose:
             except Exception as e:
                 logger.error(f"Parse LLM response error in restore_claims: {e}, response is: {response}")
                 logger.error(f"Prompt was: {messages}")
+                self.llm_client.forget(messages[0], seed=42 + i)
 
         logger.warning("Failed to restore claims after multiple retries. Returning empty mapping.")
         empty_mapping = {claim: {"text": "", "start": -1, "end": -1} for claim in claims}
@@ -1,32 +1,65 @@
 # factcheck/core/KnowledgeBase.py
 
+import re
+import time
 import uuid
 import json
+import zlib
+import hashlib
+import threading
+from collections import Counter
+from dataclasses import asdict
+import unicodedata
 import chromadb
 from factcheck.utils.logger import CustomLogger
 from factcheck.utils.data_class import ClaimDetail, Evidence
 from factcheck.utils.database import get_vector_collection
+from factcheck.utils.embedding_service import build_embedding_function
+from factcheck.utils.kv_cache import build_kv_cache
+from factcheck.utils.background import BackgroundWriter
 from factcheck.utils.config_loader import config
 
 logger = CustomLogger(__name__).getlog()
 
+FRESHNESS_TTL = config.get('knowledge_base.freshness_ttl', 604800)
+MERGE_THRESHOLD = config.get('knowledge_base.merge_threshold', 0.1)
+WRITER_MAX_BATCH = config.get('knowledge_base.writer.max_batch', 32)
+WRITER_FLUSH_INTERVAL = config.get('knowledge_base.writer.flush_interval', 2.0)
+RECORD_VERSION = 1
+
+
+def normalize_claim(text: str) -> str:
+    """Case, Unicode form, whitespace and surrounding punctuation do not change what a claim says."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" .,!?;:'\"")
+
 
 class FactKnowledgeBase:
     def __init__(self):
         collection_name = config.get('vectordb.verified_facts_collection_name', 'verified_facts')
         
         logger.info(f"Initializing FactKnowledgeBase with collection '{collection_name}'...")
+
+        # Exact-match layer in front of the vector search: normalized claim hash -> serialized ClaimDetail.
+        self.exact_cache = build_kv_cache('claims')
+        # Full verification record per Chroma document id (evidences, votes, queries, timestamps).
+        self.records = build_kv_cache('claim_records')
+        self._revalidator = None
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
+        self.writer = BackgroundWriter(
+            self._write_batch, name="kb-writer", max_batch=WRITER_MAX_BATCH, flush_interval=WRITER_FLUSH_INTERVAL
+        )
+        self.embedding_function = None
         
         try:
-
-            from chromadb.utils import embedding_functions
             emb_model_name = config.get('vectordb.embedding_model', 'intfloat/e5-base-v2')
             
             logger.info(f"FactKnowledgeBase using embedding model: {emb_model_name}")
             
-            ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name=emb_model_name
-            )
+            ef = build_embedding_function(emb_model_name)
+            self.embedding_function = ef
             
             self.collection = get_vector_collection(
                 collection_name=collection_name,
@@ -38,72 +71,273 @@ class FactKnowledgeBase:
             logger.error(f"Failed to connect to FactKnowledgeBase: {e}")
             self.collection = None
 
-    def check_cache(self, claim_text: str, threshold: float = 0.2) -> ClaimDetail | None:
-        if not self.collection:
+    def _cached_detail(self, claim_text: str, metadata: dict, cached_claim_text: str, distance: float) -> ClaimDetail:
+        logger.info(f"Cache HIT! Claim '{claim_text[:30]}...' is similar to cached '{cached_claim_text[:30]}...' (Dist: {distance:.3f})")
+
+        simulated_evidence = Evidence(
+            claim=claim_text,
+            text="[CACHED KNOWLEDGE] This claim was previously verified by FailSafe system.",
+            url="Internal Knowledge Base (Historical Data)",
+            relationship="CACHED",
+            reasoning=metadata.get('reasoning', 'No reasoning stored.')
+        )
+
+        return ClaimDetail(
+            id=-1,
+            claim=claim_text,
+            checkworthy=True,
+            checkworthy_reason="Retrieved from Knowledge Base",
+            origin_text=claim_text,
+            start=-1, end=-1,
+            queries=[],
+            evidences=[simulated_evidence],
+            factuality=float(metadata.get('factuality', 0.5))
+        )
+
+    @staticmethod
+    def _encode_record(claim_detail: ClaimDetail, verified_at: float, fresh_until: float) -> bytes:
+        evidences = []
+        for e in claim_detail.evidences:
+            evidence = asdict(e)
+            evidence.pop("claim", None)
+            evidences.append(evidence)
+        record = {
+            "v": RECORD_VERSION,
+            "claim": claim_detail.claim,
+            "factuality": claim_detail.factuality,
+            "queries": claim_detail.queries or [],
+            "evidences": evidences,
+            "urls": sorted({e.url for e in claim_detail.evidences if e.url}),
+            "verdicts": dict(Counter(e.relationship for e in claim_detail.evidences)),
+            "verified_at": verified_at,
+            "fresh_until": fresh_until,
+        }
+        return zlib.compress(json.dumps(record, separators=(",", ":")).encode("utf-8"))
+
+    def _load_record(self, doc_id: str) -> dict | None:
+        blob = self.records.get(doc_id)
+        if blob is None:
             return None
+        try:
+            record = json.loads(zlib.decompress(blob).decode("utf-8"))
+        except (zlib.error, ValueError) as e:
+            logger.warning(f"Discarding unreadable claim record '{doc_id}': {e}")
+            return None
+        return record if record.get("v") == RECORD_VERSION else None
+
+    @staticmethod
+    def _detail_from_record(claim_text: str, record: dict, distance: float) -> ClaimDetail:
+        logger.info(f"Cache HIT! Claim '{claim_text[:30]}...' matches stored record '{record['claim'][:30]}...' (Dist: {distance:.3f})")
+        return ClaimDetail(
+            id=-1,
+            claim=claim_text,
+            checkworthy=True,
+            checkworthy_reason="Retrieved from Knowledge Base",
+            origin_text=claim_text,
+            start=-1, end=-1,
+            queries=record.get("queries", []),
+            evidences=[
+                Evidence(claim=claim_text, **{k: v for k, v in e.items() if k in Evidence.__dataclass_fields__})
+                for e in record.get("evidences", [])
+            ],
+            factuality=record["factuality"]
+        )
+
+    def set_revalidator(self, revalidator):
+        """`revalidator({claim: doc_id})` is handed stale hits so they can be re-verified off the request path."""
+        self._revalidator = revalidator
+
+    def _schedule_revalidation(self, stale: dict):
+        with self._revalidating_lock:
+            stale = {claim: doc_id for claim, doc_id in stale.items() if doc_id not in self._revalidating}
+            self._revalidating.update(stale.values())
+        if not stale:
+            return
+        if self._revalidator is None:
+            self.finish_revalidation(stale.values())
+            return
+        logger.info(f"Scheduling background re-verification of {len(stale)} stale Knowledge Base entries.")
+        try:
+            self._revalidator(stale)
+        except Exception as e:
+            logger.error(f"Failed to schedule re-verification: {e}")
+            self.finish_revalidation(stale.values())
+
+    def finish_revalidation(self, doc_ids):
+        with self._revalidating_lock:
+            self._revalidating.difference_update(doc_ids)
+
+    @staticmethod
+    def _content_id(claim_text: str) -> str:
+        """Deterministic document id, so saving the same claim again overwrites instead of adding a copy."""
+        return "kb-" + hashlib.sha256(normalize_claim(claim_text).encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def _exact_key(claim_text: str) -> str:
+        return hashlib.sha256(normalize_claim(claim_text).encode("utf-8")).hexdigest()
+
+    def _check_exact(self, claim_text: str) -> ClaimDetail | None:
+        value = self.exact_cache.get(self._exact_key(claim_text))
+        if value is None:
+            return None
+        try:
+            detail = ClaimDetail.from_dict(json.loads(value))
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Discarding unreadable exact-match entry: {e}")
+            return None
+        detail.id = -1
+        detail.claim = claim_text
+        detail.origin_text = claim_text
+        logger.info(f"Exact cache HIT for claim '{claim_text[:30]}...'")
+        return detail
+
+    def _remember_exact(self, claim_detail: ClaimDetail, ttl: float = None):
+        self.exact_cache.set(self._exact_key(claim_detail.claim), json.dumps(claim_detail.to_dict()), ttl=ttl)
+
+    def check_cache(self, claim_text: str, threshold: float = 0.2) -> ClaimDetail | None:
+        return self.check_cache_batch([claim_text], threshold=threshold).get(claim_text)
+
+    def check_cache_batch(self, claims: list[str], threshold: float = 0.2) -> dict[str, ClaimDetail]:
+        """
+        Looks up every claim with a single multi-query: one embedding pass and one round trip
+        to Chroma. Returns {claim: ClaimDetail} for the claims with a close enough match.
+        Claims already seen verbatim (after normalization) are answered by the exact-match layer
+        and never reach the embedding model. Hits past their freshness window are still served and
+        handed to the revalidator for background re-verification; without a revalidator they are
+        reported as misses, so the pipeline re-verifies them inline.
+        """
+        cached = {}
+        unique_claims = []
+        for claim_text in dict.fromkeys(claims):
+            detail = self._check_exact(claim_text)
+            if detail:
+                cached[claim_text] = detail
+            else:
+                unique_claims.append(claim_text)
+
+        if not self.collection or not unique_claims:
+            return cached
 
         try:
             results = self.collection.query(
-                query_texts=[claim_text],
+                query_texts=unique_claims,
                 n_results=1,
                 include=["metadatas", "distances", "documents"]
             )
+        except Exception as e:
+            logger.warning(f"Error checking cache: {e}")
+            return cached
 
-            if not results['ids'] or not results['ids'][0]:
-                return None
+        now = time.time()
+        stale = {}
+        for i, claim_text in enumerate(unique_claims):
+            if not results['ids'] or not results['ids'][i]:
+                continue
+            distance = results['distances'][i][0]
+            if distance >= threshold:
+                continue
 
-            distance = results['distances'][0][0]
-            
-            if distance < threshold:
-                metadata = results['metadatas'][0][0]
-                cached_claim_text = results['documents'][0][0]
-                
-                logger.info(f"Cache HIT! Claim '{claim_text[:30]}...' is similar to cached '{cached_claim_text[:30]}...' (Dist: {distance:.3f})")
-
-                simulated_evidence = Evidence(
-                    claim=claim_text,
-                    text="[CACHED KNOWLEDGE] This claim was previously verified by FailSafe system.",
-                    url="Internal Knowledge Base (Historical Data)",
-                    relationship="CACHED",
-                    reasoning=metadata.get('reasoning', 'No reasoning stored.')
-                )
-
-                return ClaimDetail(
-                    id=-1, 
-                    claim=claim_text,
-                    checkworthy=True,
-                    checkworthy_reason="Retrieved from Knowledge Base",
-                    origin_text=claim_text,
-                    start=-1, end=-1,
-                    queries=[],
-                    evidences=[simulated_evidence],
-                    factuality=float(metadata.get('factuality', 0.5))
-                )
-            
-            return None
+            doc_id = results['ids'][i][0]
+            metadata = results['metadatas'][i][0] or {}
+            record = self._load_record(doc_id)
+            stored_claim = results['documents'][i][0]
+            if record:
+                cached[claim_text] = self._detail_from_record(claim_text, record, distance)
+                fresh_until = record.get("fresh_until", 0)
+                stored_claim = record.get("claim") or stored_claim
+            else:
+                # Entries saved before claim records existed only carry a verdict; refresh them too.
+                cached[claim_text] = self._cached_detail(claim_text, metadata, stored_claim, distance)
+                fresh_until = metadata.get("fresh_until", 0)
 
-        except Exception as e:
-            logger.warning(f"Error checking cache: {e}")
-            return None
+            if now < fresh_until:
+                self._remember_exact(cached[claim_text], ttl=fresh_until - now)
+            elif self._revalidator is None:
+                del cached[claim_text]
+            elif stored_claim:
+                # Re-verify what the document says, not the (possibly paraphrased) incoming claim.
+                stale[stored_claim] = doc_id
+
+        if stale:
+            self._schedule_revalidation(stale)
+        logger.info(f"Knowledge Base lookup: {len(cached)}/{len(dict.fromkeys(claims))} claims found.")
+        return cached
+
+    def save_knowledge(self, claim_detail: ClaimDetail, doc_id: str = None):
+        self.save_knowledge_batch([claim_detail], doc_ids=[doc_id])
 
-    def save_knowledge(self, claim_detail: ClaimDetail):
-        if not self.collection or not claim_detail.evidences:
+    def save_knowledge_batch(self, claim_details: list[ClaimDetail], doc_ids: list[str] = None, background: bool = True):
+        """
+        Stores verified claims. The exact-match layer is updated right away; the Chroma upsert and
+        claim records are written by the background writer unless `background` is False.
+        `doc_ids` pins entries to existing documents (re-verification); otherwise ids are content hashes.
+        """
+        doc_ids = doc_ids or [None] * len(claim_details)
+        items = [
+            (detail, doc_id) for detail, doc_id in zip(claim_details, doc_ids)
+            if detail.evidences and isinstance(detail.factuality, float)
+        ]
+        for detail, _ in items:
+            self._remember_exact(detail, ttl=FRESHNESS_TTL)
+        if not self.collection or not items:
             return
 
+        if not background:
+            self._write_batch(items)
+            return
+        for item in items:
+            self.writer.submit(item)
+
+    def _write_batch(self, items: list[tuple[ClaimDetail, str]]):
+        """Embeds the claims once, merges near-duplicates into existing documents and upserts everything in one call."""
+        if not self.collection or not items:
+            return
+
+        claims = [detail.claim for detail, _ in items]
         try:
-            fact_score = claim_detail.factuality
-            if isinstance(fact_score, float):
-                combined_reasoning = " || ".join([e.reasoning[:200] for e in claim_detail.evidences if e.reasoning])
-                
-                self.collection.add(
-                    documents=[claim_detail.claim],
-                    metadatas=[{
-                        "factuality": fact_score,
-                        "reasoning": combined_reasoning[:1000] 
-                    }],
-                    ids=[str(uuid.uuid4())]
-                )
-                logger.info(f"Saved new knowledge: '{claim_detail.claim[:30]}...'")
+            embeddings = [list(map(float, e)) for e in self.embedding_function(claims)]
+        except Exception as e:
+            logger.error(f"Failed to embed {len(claims)} claims; not saved to the Knowledge Base: {e}. Dropped: {claims}")
+            return
+        ids = [doc_id or self._content_id(detail.claim) for detail, doc_id in items]
 
+        try:
+            neighbours = self.collection.query(query_embeddings=embeddings, n_results=1, include=["distances"])
+        except Exception as e:
+            logger.warning(f"Near-duplicate lookup failed, saving without merging: {e}")
+            neighbours = {"ids": [], "distances": []}
+        for i, (_, doc_id) in enumerate(items):
+            if doc_id or i >= len(neighbours["ids"]) or not neighbours["ids"][i]:
+                continue
+            if neighbours["distances"][i][0] < MERGE_THRESHOLD:
+                ids[i] = neighbours["ids"][i][0]
+
+        # Claims that collapse onto the same document keep the latest verification.
+        batch = {}
+        for doc_id, (detail, _), embedding in zip(ids, items, embeddings):
+            batch[doc_id] = (detail, embedding)
+
+        verified_at = time.time()
+        fresh_until = verified_at + FRESHNESS_TTL
+        metadatas = []
+        for detail, _ in batch.values():
+            combined_reasoning = " || ".join([e.reasoning[:200] for e in detail.evidences if e.reasoning])
+            metadatas.append({
+                "factuality": detail.factuality,
+                "reasoning": combined_reasoning[:1000],
+                "verified_at": verified_at,
+                "fresh_until": fresh_until,
+            })
+
+        try:
+            self.collection.upsert(
+                ids=list(batch.keys()),
+                embeddings=[embedding for _, embedding in batch.values()],
+                documents=[detail.claim for detail, _ in batch.values()],
+                metadatas=metadatas
+            )
+            for doc_id, (detail, _) in batch.items():
+                self.records.set(doc_id, self._encode_record(detail, verified_at, fresh_until))
+            logger.info(f"Saved {len(batch)} knowledge entries ({len(items) - len(batch)} merged within the batch).")
         except Exception as e:
-            logger.error(f"Failed to save knowledge: {e}")
\ No newline at end of file
+            logger.error(f"Failed to save knowledge: {e}. Dropped: {[detail.claim for detail, _ in batch.values()]}")
@@ -1,33 +1,34 @@
 # ./factcheck/core/Retriever/base.py 
 
-from concurrent.futures import ProcessPoolExecutor
-import os
 import torch
 from copy import deepcopy
-from factcheck.utils.web_util import parse_response, crawl_web
+from factcheck.utils.web_util import parse_documents, crawl_web
+from factcheck.utils.page_cache import get_page_cache
+from factcheck.utils.config_loader import config
+from factcheck.utils.inference import load_cross_encoder, get_device
 from factcheck.utils.logger import CustomLogger
 
 logger = CustomLogger(__name__).getlog()
 
+RERANK_BATCH_SIZE = config.get('retriever.rerank.batch_size', 32)
+
 
 class BaseRetriever:
     def __init__(self, llm_client, api_config: dict = None):
         import spacy
 
         self.tokenizer = spacy.load("en_core_web_sm", disable=["ner", "tagger", "lemmatizer"])
-        from sentence_transformers import CrossEncoder
-        import torch
-
-        self.passage_ranker = CrossEncoder(
+        self.passage_ranker = load_cross_encoder(
             "cross-encoder/ms-marco-MiniLM-L-6-v2",
             max_length=512,
-            device=torch.device("cuda" if torch.cuda.is_available() else "cpu"),
+            device=get_device(),
         )
         self.lang = "en"
         self.max_search_result_per_query = 3
         self.sentences_per_passage = 10
         self.sliding_distance = 8
         self.max_passages_per_search_result_to_return = 5
+        self.rerank_batch_size = RERANK_BATCH_SIZE
         assert self.sentences_per_passage > self.sliding_distance
         self.llm_client = llm_client
 
@@ -38,37 +39,59 @@ class BaseRetriever:
         self.max_search_result_per_query = m
 
     def retrieve_evidence(self, claim_query_dict):
-        claim_evidence_dict = {}
+        claim_query_passages = {}
         for claim, query_list in claim_query_dict.items():
             logger.info(f"Collecting evidences for claim : {claim}")
-            evidences = self._retrieve_evidence4singleclaim(claim, query_list=query_list)
-            claim_evidence_dict[claim] = evidences
+            query_url_dict = self._get_query_urls(query_list)
+            query_scraped_results_dict = self._crawl_and_parse_web(query_url_dict=query_url_dict)
+            claim_query_passages[claim] = {
+                query: self._chunk_scraped_results(scraped_results)
+                for query, scraped_results in query_scraped_results_dict.items()
+            }
+
+        # Rerank every (query, passage) pair of every claim in one batched pass, then scatter the scores back.
+        pairs = [
+            (query, passage[0])
+            for query_passages in claim_query_passages.values()
+            for query, (passages, _) in query_passages.items()
+            for passage in passages
+        ]
+        logger.info(f"Reranking {len(pairs)} passages for {len(claim_query_passages)} claims in one pass.")
+        scores = iter(self._score_pairs(pairs))
+
+        claim_evidence_dict = {}
+        for claim, query_passages in claim_query_passages.items():
+            snippets_dict = {}
+            for query, (passages, url) in query_passages.items():
+                passage_scores = [next(scores) for _ in passages]
+                snippets_dict[query] = self._select_passages(passages, passage_scores, url)
+            claim_evidence_dict[claim] = self._get_relevant_snippets(snippets_dict)
         return claim_evidence_dict
 
     def _retrieve_evidence4singleclaim(self, claim: str, query_list: list[str]):
-        query_url_dict = self._get_query_urls(query_list)
-        query_scraped_results_dict = self._crawl_and_parse_web(query_url_dict=query_url_dict)
-        evidences = self._get_relevant_snippets(query_scraped_results_dict=query_scraped_results_dict)
-        return evidences
+        return self.retrieve_evidence({claim: query_list})[claim]
 
     def _crawl_and_parse_web(self, query_url_dict: dict[str, list]):
         responses = crawl_web(query_url_dict=query_url_dict)
-        query_responses_dict = dict()
-        for flag, response, url, query in responses:
-            if flag and ".pdf" not in str(response.url):
-                response_list = query_responses_dict.get(query, [])
-                response_list.append([response, url])
-                query_responses_dict[query] = response_list
+        page_cache = get_page_cache()
+        parsed, documents, to_parse = list(), list(), list()
+        for flag, page, url, query in responses:
+            if not flag or ".pdf" in page.final_url:
+                continue
+            found, text = page_cache.cached_text(page, "visible")
+            if found:
+                parsed.append((text, url, query))
+            else:
+                # Only pages without a cached extraction go through the parse pool; their text is kept for next time.
+                to_parse.append((len(parsed), page))
+                documents.append((page.html, None, url, query))
+                parsed.append(None)
+        for (index, page), result in zip(to_parse, parse_documents(documents)):
+            page_cache.set_text(page, "visible", result[0])
+            parsed[index] = result
 
         query_scraped_results_dict = dict()
-        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
-            futures = list()
-            for query, response_list in query_responses_dict.items():
-                for response, url in response_list:
-                    future = executor.submit(parse_response, response, url, query)
-                    futures.append(future)
-        for future in futures:
-            web_text, url, query = future.result()
+        for web_text, url, query in parsed:
             scraped_results_list = query_scraped_results_dict.get(query, [])
             scraped_results_list.append([web_text, url])
             query_scraped_results_dict[query] = scraped_results_list
@@ -78,10 +101,8 @@ class BaseRetriever:
             query_scraped_results_dict[query] = scraped_results[: self.max_search_result_per_query]
         return query_scraped_results_dict
 
-    def _get_relevant_snippets(self, query_scraped_results_dict: dict[str:list]):
-        snippets_dict = {}
-        for query, scraped_results in query_scraped_results_dict.items():
-            snippets_dict[query] = self._sorted_passage_by_relevant_score(query, scraped_results=scraped_results)
+    def _get_relevant_snippets(self, snippets_dict: dict[str:list]):
+        for query in snippets_dict:
             snippets_dict[query] = deepcopy(
                 sorted(
                     snippets_dict[query],
@@ -100,15 +121,40 @@ class BaseRetriever:
                 break
         return evidences["aggregated"]
 
-    def _sorted_passage_by_relevant_score(self, query: str, scraped_results: list[str]):
-        retrieved_passages = list()
+    def _score_pairs(self, pairs: list[tuple[str, str]]) -> list[float]:
+        """
+        Scores (query, passage) pairs with the cross-encoder. Pairs are sorted by length so each
+        batch holds similarly sized inputs and pads little; scores come back in input order.
+        """
+        if not pairs:
+            return []
+        order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+        sorted_scores = self.passage_ranker.predict(
+            [pairs[i] for i in order], batch_size=self.rerank_batch_size, show_progress_bar=False
+        ).tolist()
+        scores = [0.0] * len(pairs)
+        for i, score in zip(order, sorted_scores):
+            scores[i] = score
+        return scores
+
+    def _chunk_scraped_results(self, scraped_results: list[str]):
         weball = ""
+        url = None
         for webtext, url in scraped_results:
             weball += webtext
-        passages = self._chunk_text(text=weball, tokenizer=self.tokenizer)
+        return self._chunk_text(text=weball, tokenizer=self.tokenizer), url
+
+    def _sorted_passage_by_relevant_score(self, query: str, scraped_results: list[str]):
+        passages, url = self._chunk_scraped_results(scraped_results)
         if not passages:
             return []
-        scores = self.passage_ranker.predict([(query, p[0]) for p in passages]).tolist()
+        scores = self._score_pairs([(query, p[0]) for p in passages])
+        return self._select_passages(passages, scores, url)
+
+    def _select_passages(self, passages: list[tuple], scores: list[float], url: str):
+        retrieved_passages = list()
+        if not passages:
+            return retrieved_passages
         passage_scores = list(zip(passages, scores))
         passage_scores.sort(key=lambda x: x[1], reverse=True)
 
@@ -1,11 +1,13 @@
 # ./factcheck/core/Retriever/hybrid_retriever.py
 
+import asyncio
 import chromadb
 from sentence_transformers import SentenceTransformer
 from .serper_retriever import SerperEvidenceRetriever
 from factcheck.utils.logger import CustomLogger
 from factcheck.utils.config_loader import config
 from factcheck.utils.database import DatabaseProvider
+from factcheck.utils.embedding_service import build_embedding_function
 import re
 
 logger = CustomLogger(__name__).getlog()
@@ -24,11 +26,8 @@ class HybridRetriever:
         try:
             logger.info(f"Loading embedding model '{EMBEDDING_MODEL_NAME}'...")
             client = DatabaseProvider.get_chroma_client()
-            
-            from chromadb.utils import embedding_functions
-            embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-                model_name=EMBEDDING_MODEL_NAME
-            )
+
+            embedding_function = build_embedding_function(EMBEDDING_MODEL_NAME)
             
             self.collection = client.get_collection(
                 name=COLLECTION_NAME,
@@ -104,4 +103,28 @@ class HybridRetriever:
             unique_evidences = {ev['url']: ev for ev in all_evidences_for_claim}.values()
             final_claim_evidence_dict[claim] = list(unique_evidences)
             
-        return final_claim_evidence_dict
\ No newline at end of file
+        return final_claim_evidence_dict
+
+    async def aretrieve_evidence(self, claim_queries_dict, top_k: int = 3, **kwargs):
+        """
+        Async variant of `retrieve_evidence`: Vector DB lookups run in worker threads, and every claim
+        that needs the web fallback goes out in one async Serper search.
+        """
+        claims = [claim for claim, queries in claim_queries_dict.items() if queries]
+        vector_results = await asyncio.gather(*(
+            asyncio.to_thread(self._search_vector_db, claim_queries_dict[claim][0], top_k) for claim in claims
+        ))
+        vector_evidences = dict(zip(claims, vector_results))
+
+        web_queries = {claim: claim_queries_dict[claim] for claim in claims if len(vector_evidences[claim]) < top_k}
+        web_evidences_dict = {}
+        if web_queries:
+            logger.info(f"Not enough results from Vector DB for {len(web_queries)} claims. Falling back to web search.")
+            web_evidences_dict = await self.web_retriever.aretrieve_evidence(claim_queries_dict=web_queries, top_k=top_k)
+
+        final_claim_evidence_dict = {}
+        for claim in claim_queries_dict:
+            all_evidences_for_claim = vector_evidences.get(claim, []) + web_evidences_dict.get(claim, [])
+            unique_evidences = {ev['url']: ev for ev in all_evidences_for_claim}.values()
+            final_claim_evidence_dict[claim] = list(unique_evidences)
+        return final_claim_evidence_dict
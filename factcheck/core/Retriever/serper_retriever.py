@@ -1,14 +1,39 @@
 # ./factcheck/core/Retriever/serper_retriever.py 
 
 import json
-import requests
 import re
+import asyncio
+import hashlib
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+import backoff
+import httpx
 from factcheck.utils.logger import CustomLogger
 from factcheck.core.Screening import MetadataAnalyzer
 from factcheck.utils.deep_scraper import DeepScraper
+from factcheck.utils.kv_cache import build_kv_cache
+from factcheck.utils.config_loader import config
+from factcheck.utils.event_loop import run_coroutine
+from factcheck.utils.http_client import ahttp_request
 
 logger = CustomLogger(__name__).getlog()
 
+SERPER_URL = "https://google.serper.dev/search"
+SERPER_BATCH_SIZE = config.get('retriever.serper.batch_size', 100)
+SERPER_MAX_CONCURRENCY = config.get('retriever.serper.max_concurrency', 4)
+SERPER_MAX_TRIES = config.get('retriever.serper.max_tries', 3)
+SERPER_TIMEOUT = config.get('retriever.serper.timeout', 10)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+def _is_permanent_error(e: Exception) -> bool:
+    # A bad key or malformed request fails the same way every time; rate limits and server errors are retried.
+    return isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500 and e.response.status_code != 429
+
 
 class SerperEvidenceRetriever:
     def __init__(self, llm_client, api_config: dict = None):
@@ -19,6 +44,12 @@ class SerperEvidenceRetriever:
         self.llm_client = llm_client
         self.metadata_analyzer = MetadataAnalyzer(llm_client=self.llm_client)
         self.scraper = DeepScraper(max_workers=5)
+        # Top-k evidences per (query, language, top_k). Stale entries are served while a refresh runs.
+        self.search_cache = build_kv_cache('serper')
+        self._refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="serper-refresh")
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+        self.refresh_stats = {"scheduled": 0, "refreshed": 0, "failed": 0}
 
     def retrieve_evidence(self, claim_queries_dict, top_k: int = 3, **kwargs):
         logger.info("Collecting and screening evidences...")
@@ -27,7 +58,19 @@ class SerperEvidenceRetriever:
         evidence_list_per_query = self._retrieve_evidence_4_all_claim(
             query_list=query_list, top_k=top_k
         )
+        return self._group_by_claim(claim_queries_dict, evidence_list_per_query)
 
+    async def aretrieve_evidence(self, claim_queries_dict, top_k: int = 3, **kwargs):
+        """Async variant of `retrieve_evidence` for the shared event loop: searches on the loop, screens in a worker thread."""
+        logger.info("Collecting and screening evidences...")
+        query_list = [y for x in claim_queries_dict.items() for y in x[1]]
+
+        raw_evidences_per_query = await self._asearch(query_list, top_k)
+        evidence_list_per_query = await asyncio.to_thread(self._screen_evidences, raw_evidences_per_query)
+        return self._group_by_claim(claim_queries_dict, evidence_list_per_query)
+
+    @staticmethod
+    def _group_by_claim(claim_queries_dict, evidence_list_per_query: list[list[dict]]) -> dict:
         i = 0
         claim_evidence_dict = {}
         for claim, queries in claim_queries_dict.items():
@@ -43,31 +86,11 @@ class SerperEvidenceRetriever:
     def _retrieve_evidence_4_all_claim(
         self, query_list: list[str], top_k: int = 3
     ) -> list[list[dict]]:
-        all_raw_evidences_map = {}  
-        
-        serper_responses = []
-        for i in range(0, len(query_list), 100):
-            batch_query_list = query_list[i : i + 100]
-            batch_response = self._request_serper_api(batch_query_list)
-            if batch_response is None:
-                logger.error("Serper API request error!")
-                return [[] for _ in query_list]
-            serper_responses.extend(batch_response.json())
-            
-        for i, (query, response) in enumerate(zip(query_list, serper_responses)):
-            raw_evidences = []
-            if "answerBox" in response:
-                answer_text = response["answerBox"].get("answer") or response["answerBox"].get("snippet", "")
-                raw_evidences.append({"text": f"{query}\nAnswer: {answer_text}", "url": "Google Answer Box"})
-            else:
-                topk_results = response.get("organic", [])[:top_k]
-                for result in topk_results:
-                    if "snippet" in result and "link" in result:
-                        raw_evidences.append({
-                            "text": re.sub(r"\n+", "\n", result["snippet"]),
-                            "url": result["link"]
-                        })
-            all_raw_evidences_map[i] = raw_evidences
+        return self._screen_evidences(self._search(query_list, top_k))
+
+    def _screen_evidences(self, raw_evidences_per_query: list[list[dict]]) -> list[list[dict]]:
+        """Annotates evidences with source trust, enriches high-trust ones with full content and drops low-trust ones."""
+        all_raw_evidences_map = dict(enumerate(raw_evidences_per_query))
         all_urls_to_analyze = [
             ev['url'] for evidences in all_raw_evidences_map.values() for ev in evidences 
             if ev.get('url') and ev.get('url') != 'Google Answer Box'
@@ -82,7 +105,7 @@ class SerperEvidenceRetriever:
         logger.info(f"Deep scraping contents for {len(high_trust_urls)} high-trust URLs...")
         scraped_contents = self.scraper.scrape_batch(high_trust_urls)
 
-        evidences_per_query = [[] for _ in query_list]
+        evidences_per_query = [[] for _ in raw_evidences_per_query]
         for query_index, evidences in all_raw_evidences_map.items():
             screened_evidences = []
             for evidence in evidences:
@@ -105,28 +128,166 @@ class SerperEvidenceRetriever:
 
         return evidences_per_query
 
-    def _request_serper_api(self, questions: list[str]):
+    def _cache_key(self, query: str, top_k: int) -> str:
+        key_data = {"q": normalize_query(query), "lang": self.lang, "top_k": top_k}
+        return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _parse_serper_response(query: str, response: dict, top_k: int) -> list[dict]:
+        raw_evidences = []
+        if "answerBox" in response:
+            answer_text = response["answerBox"].get("answer") or response["answerBox"].get("snippet", "")
+            raw_evidences.append({"text": f"{query}\nAnswer: {answer_text}", "url": "Google Answer Box"})
+        else:
+            topk_results = response.get("organic", [])[:top_k]
+            for result in topk_results:
+                if "snippet" in result and "link" in result:
+                    raw_evidences.append({
+                        "text": re.sub(r"\n+", "\n", result["snippet"]),
+                        "url": result["link"]
+                    })
+        return raw_evidences
+
+    async def _adispatch(self, query_list: list[str], top_k: int) -> dict[str, list[dict]]:
         """
-        Requests the Serper API.
+        Sends `query_list` to Serper in batches of SERPER_BATCH_SIZE, up to SERPER_MAX_CONCURRENCY at a time.
+        Returns the top-k evidences of every query whose batch succeeded; failed batches are left out.
         """
-        url = "https://google.serper.dev/search"
+        semaphore = asyncio.Semaphore(SERPER_MAX_CONCURRENCY)
+        batches = [query_list[i : i + SERPER_BATCH_SIZE] for i in range(0, len(query_list), SERPER_BATCH_SIZE)]
+
+        async def dispatch(batch):
+            async with semaphore:
+                return await self._arequest_serper_api(batch)
+
+        responses = await asyncio.gather(*(dispatch(batch) for batch in batches))
+        results = {}
+        for batch, batch_response in zip(batches, responses):
+            if batch_response is None:
+                continue
+            for query, response in zip(batch, batch_response):
+                results[query] = self._parse_serper_response(query, response, top_k)
+        if len(results) < len(query_list):
+            logger.error(f"Serper API request error! No results for {len(query_list) - len(results)}/{len(query_list)} queries.")
+        return results
+
+    def _store_results(self, results: dict[str, list[dict]], top_k: int):
+        for query, evidences in results.items():
+            self.search_cache.set(self._cache_key(query, top_k), json.dumps(evidences))
+
+    def _fetch_results(self, query_list: list[str], top_k: int) -> dict[str, list[dict]]:
+        """Queries Serper for `query_list` and caches the top-k evidences of each query that succeeded."""
+        results = run_coroutine(self._adispatch(query_list, top_k))
+        self._store_results(results, top_k)
+        return results
+
+    async def _afetch_results(self, query_list: list[str], top_k: int) -> dict[str, list[dict]]:
+        results = await self._adispatch(query_list, top_k)
+        await asyncio.to_thread(self._store_results, results, top_k)
+        return results
+
+    def _lookup(self, query_list: list[str], top_k: int) -> tuple[list[str], dict, dict, list[str]]:
+        """Cache lookup for each distinct query. Returns the per-query keys, the cached results, the misses and the stale hits."""
+        keys = [self._cache_key(query, top_k) for query in query_list]
+        unique_queries = {}
+        for key, query in zip(keys, query_list):
+            unique_queries.setdefault(key, query)
+
+        results = {}
+        missing, stale = {}, []
+        for key, query in unique_queries.items():
+            entry = self.search_cache.get_entry(key, allow_stale=True)
+            if entry is None:
+                missing[key] = query
+                continue
+            results[key] = json.loads(entry.value)
+            if entry.is_stale:
+                stale.append(query)
+        return keys, results, missing, stale
+
+    def _finish_search(self, keys: list[str], results: dict, missing: dict, stale: list[str], top_k: int) -> list[list[dict]]:
+        if stale:
+            self._schedule_refresh(stale, top_k)
+
+        num_fetched = sum(1 for key in keys if key in missing)
+        logger.info(f"Serper search: {len(keys) - num_fetched}/{len(keys)} queries served without a "
+                    f"request ({len(stale)} stale). Cache hit rate {self.search_cache.get_stats()['hit_rate']:.1%}.")
+        # Callers annotate evidences in place, so every query gets its own copies.
+        return [[dict(evidence) for evidence in results.get(key, [])] for key in keys]
+
+    def _search(self, query_list: list[str], top_k: int) -> list[list[dict]]:
+        """Top-k raw evidences per query: served from the search cache where possible, Serper for the rest."""
+        keys, results, missing, stale = self._lookup(query_list, top_k)
+        if missing:
+            fetched = self._fetch_results(list(missing.values()), top_k)
+            results.update((key, fetched[query]) for key, query in missing.items() if query in fetched)
+        return self._finish_search(keys, results, missing, stale, top_k)
+
+    async def _asearch(self, query_list: list[str], top_k: int) -> list[list[dict]]:
+        keys, results, missing, stale = await asyncio.to_thread(self._lookup, query_list, top_k)
+        if missing:
+            fetched = await self._afetch_results(list(missing.values()), top_k)
+            results.update((key, fetched[query]) for key, query in missing.items() if query in fetched)
+        return self._finish_search(keys, results, missing, stale, top_k)
+
+    def _schedule_refresh(self, queries: list[str], top_k: int):
+        with self._refresh_lock:
+            queries = [query for query in queries if (query, top_k) not in self._refreshing]
+            self._refreshing.update((query, top_k) for query in queries)
+        if queries:
+            self.refresh_stats["scheduled"] += len(queries)
+            self._refresh_executor.submit(self._refresh, queries, top_k)
+
+    def _refresh(self, queries: list[str], top_k: int):
+        try:
+            refreshed = len(self._fetch_results(queries, top_k))
+            self.refresh_stats["refreshed"] += refreshed
+            self.refresh_stats["failed"] += len(queries) - refreshed
+        except Exception as e:
+            self.refresh_stats["failed"] += len(queries)
+            logger.warning(f"Background refresh of {len(queries)} Serper queries failed: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.difference_update((query, top_k) for query in queries)
+
+    def get_cache_stats(self) -> dict:
+        return {**self.search_cache.get_stats(), "refresh": dict(self.refresh_stats)}
+
+    @backoff.on_exception(backoff.expo, (httpx.HTTPError, ValueError), max_tries=SERPER_MAX_TRIES, giveup=_is_permanent_error)
+    async def _apost_batch(self, questions: list[str]) -> list[dict]:
         headers = {"X-API-KEY": self.serper_key, "Content-Type": "application/json"}
         questions_data = [{"q": question, "autocorrect": False} for question in questions]
-        payload = json.dumps(questions_data)
-        
+        response = await ahttp_request(
+            "POST", SERPER_URL, headers=headers, content=json.dumps(questions_data), timeout=SERPER_TIMEOUT
+        )
+        response.raise_for_status()
+        results = response.json()
+        if not isinstance(results, list) or len(results) != len(questions):
+            raise ValueError(f"expected {len(questions)} results, got {len(results) if isinstance(results, list) else type(results).__name__}")
+        return results
+
+    async def _arequest_serper_api(self, questions: list[str]) -> list[dict] | None:
+        """
+        Requests the Serper API for one batch of questions, retrying transient failures.
+        Returns one response per question, or None if the batch failed.
+        """
         try:
-            response = requests.request("POST", url, headers=headers, data=payload, timeout=10)
-            response.raise_for_status()
-            return response
-        except requests.exceptions.HTTPError as e:
+            return await self._apost_batch(questions)
+        except httpx.HTTPStatusError as e:
             if e.response.status_code == 403:
                 logger.error("Serper API authentication failed. Check your SERPER_API_KEY.")
             else:
                 logger.error(f"Serper API request failed with status {e.response.status_code}: {e.response.text}")
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"An error occurred while calling Serper API: {e}")
+        except ValueError as e:
+            logger.error(f"Serper API returned an unexpected response: {e}")
         return None
 
+    def _request_serper_api(self, questions: list[str]) -> list[dict] | None:
+        return run_coroutine(self._arequest_serper_api(questions))
+
+
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
@@ -137,4 +298,4 @@ if __name__ == "__main__":
         retriever = SerperEvidenceRetriever(llm_client=None, api_config=api_config)
         test_result = retriever._request_serper_api(["Apple", "IBM"])
         if test_result:
-            print(json.dumps(test_result.json(), indent=2))
\ No newline at end of file
+            print(json.dumps(test_result, indent=2))
\ No newline at end of file
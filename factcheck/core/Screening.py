@@ -1,28 +1,138 @@
 # factcheck/core/Screening.py 
 
 import re
+import os
 import sqlite3
 import json
+import threading
+from contextlib import closing
 from factcheck.utils.logger import CustomLogger
 import chromadb
-import uuid
 import math
-from factcheck.utils.database import DatabaseProvider
-from collections import Counter
+import time
+import hashlib
 import pickle
+from collections import Counter
+from itertools import compress
 import numpy as np
 from urllib.parse import urlparse
 from factcheck.utils.config_loader import config, PROJECT_ROOT 
+from factcheck.utils.embedding_service import build_embedding_function
+from factcheck.utils.background import BackgroundWriter
+from factcheck.utils.utils import hash_terms, save_idf_table
 
 logger = CustomLogger(__name__).getlog()
 
 SQLITE_DB_PATH = str(PROJECT_ROOT / config.get('database.sqlite_path', 'data/sources.db'))
+SOURCES_RELOAD_INTERVAL = config.get('database.sources_reload_interval', 5)
+
+LESSON_MAX_CHARS = config.get('screening.learning.max_doc_chars', 2000)
+LESSONS_PER_LABEL = config.get('screening.learning.max_per_label', 5000)
+LESSON_EVICTION = config.get('screening.learning.eviction', 'least_used')
+LEARNING_MAX_BATCH = config.get('screening.learning.max_batch', 32)
+LEARNING_FLUSH_INTERVAL = config.get('screening.learning.flush_interval', 5.0)
+
+ROUTING_ENABLED = config.get('screening.routing.enabled', False)
+ROUTING_SKIP_LABELS = set(config.get('screening.routing.skip_labels', ['opinion', 'no_claims']))
+ROUTING_NEIGHBOURS = config.get('screening.routing.n_results', 5)
+ROUTING_MAX_DISTANCE = config.get('screening.routing.max_distance', 0.5)
+ROUTING_MIN_CONFIDENCE = config.get('screening.routing.min_confidence', 0.8)
+ROUTING_MIN_NEIGHBOURS = config.get('screening.routing.min_neighbours', 2)
+COUNT_REFRESH_INTERVAL = config.get('screening.routing.count_refresh_interval', 60)
+
+
+def normalize_domain(domain: str) -> str:
+    """'https://WWW.Example.co.uk:443/path' or 'www.example.co.uk.' -> 'example.co.uk'."""
+    domain = domain.strip().lower()
+    if "://" in domain:
+        domain = domain.split("://", 1)[1]
+    domain = domain.split("/", 1)[0].split(":", 1)[0].rstrip(".")
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+class SourceReputationIndex:
+    """
+    In-memory copy of the MBFC `sources` table as a trie over reversed domain labels
+    ('news.bbc.co.uk' -> uk / co / bbc / news). A lookup walks the labels once and returns the
+    record of the longest listed suffix. The table is re-read when the database file changes.
+    """
+    _RECORD = ""  # trie key holding the record of the domain that ends at a node; never a valid label
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, db_path: str = SQLITE_DB_PATH, reload_interval: float = SOURCES_RELOAD_INTERVAL):
+        self.db_path = db_path
+        self.reload_interval = reload_interval
+        self._trie = {}
+        self._mtime = None
+        self._checked_at = 0.0
+        self._reload_lock = threading.Lock()
+        self._maybe_reload(force=True)
+
+    @classmethod
+    def shared(cls) -> "SourceReputationIndex":
+        """One index per process, shared by every MetadataAnalyzer."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _load(self) -> tuple[dict, int]:
+        trie, count = {}, 0
+        with closing(sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)) as conn:
+            conn.row_factory = sqlite3.Row
+            for row in conn.execute("SELECT * FROM sources"):
+                domain = normalize_domain(row["domain"] or "")
+                if not domain:
+                    continue
+                node = trie
+                for label in reversed(list(filter(None, domain.split(".")))):
+                    node = node.setdefault(label, {})
+                # First record wins, as with the UNIQUE constraint the import relies on.
+                if self._RECORD not in node:
+                    node[self._RECORD] = dict(row)
+                    count += 1
+        return trie, count
+
+    def _maybe_reload(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_interval:
+            return
+        with self._reload_lock:
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.db_path).st_mtime_ns
+            except OSError:
+                if force:
+                    logger.warning(f"Source database not found at {self.db_path}. Domain reputation falls back to the LLM.")
+                return
+            if mtime == self._mtime:
+                return
+            try:
+                trie, count = self._load()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to load sources from {self.db_path}: {e}")
+                return
+            # Swapped in whole, so concurrent lookups see either the old or the new table.
+            self._trie, self._mtime = trie, mtime
+            logger.info(f"Loaded {count} sources into the reputation index.")
+
+    def lookup(self, domain: str) -> dict | None:
+        """Record of the longest suffix of `domain` listed in the sources table, or None."""
+        self._maybe_reload()
+        node, record = self._trie, None
+        for label in reversed(list(filter(None, normalize_domain(domain).split(".")))):
+            node = node.get(label)
+            if node is None:
+                break
+            record = node.get(self._RECORD, record)
+        return record
 
 
 class MetadataAnalyzer:
     def __init__(self, llm_client=None):
         self.llm_client = llm_client
-        self.conn = None
+        self.source_index = SourceReputationIndex.shared()
         self.llm_cache = {}
 
     def _get_domain_from_url(self, url: str) -> str | None:
@@ -34,29 +144,9 @@ class MetadataAnalyzer:
             return None
 
     def _query_local_db(self, domain: str):
-        if not self.conn or not domain:
-            return None
-        try:
-            conn = DatabaseProvider.get_sqlite_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT * FROM sources WHERE domain = ?", (domain,))
-            result = cursor.fetchone()
-            
-            if result:
-                return dict(result)
-            domain_parts = domain.split('.')
-            if len(domain_parts) > 2:
-                parent_domain = '.'.join(domain_parts[-2:])
-                cursor.execute("SELECT * FROM sources WHERE domain = ?", (parent_domain,))
-                result = cursor.fetchone()
-                if result:
-                    return dict(result)
-            conn.close()
-            return None
-        except Exception as e:
-            logger.error(f"Error querying local DB: {e}")
+        if not domain:
             return None
+        return self.source_index.lookup(domain)
 
     def _evaluate_domains_with_llm(self, domains: list[str]) -> dict:
         """Sử dụng LLM để đánh giá một danh sách các domain song song."""
@@ -156,6 +246,9 @@ class MetadataAnalyzer:
 
 
 class StylometryAnalyzer:
+    WORD_PATTERN = re.compile(r'\b\w+\b')
+    TOP_K_KEYWORDS = 5
+
     def __init__(self):
         self.sensational_words = {
             'shocking', 'amazing', 'unbelievable', 'secret', 'exposed', 'bombshell',
@@ -163,70 +256,126 @@ class StylometryAnalyzer:
             'scandal', 'mind-blowing', 'must-see', 'breaking', 'urgent', 'warning'
         }
         
-        self.idf_vectorizer = None
+        self.idf_hashes = None
+        self.idf_values = None
         self.entropy_stats = {"mean": 0, "std": 1}
         
-        idf_path = PROJECT_ROOT / 'models/stylometry/idf_vector.pkl'
-        stats_path = PROJECT_ROOT / 'models/stylometry/entropy_stats.json'
-        
+        model_dir = PROJECT_ROOT / 'models/stylometry'
+        stats_path = model_dir / 'entropy_stats.json'
+        self._convert_legacy_idf(model_dir)
+
         try:
-            with open(idf_path, 'rb') as f:
-                self.idf_vectorizer = pickle.load(f)
+            # Memory-mapped, so every worker on the host shares the same pages (see scripts/build_stylometry_corpus.py).
+            self.idf_hashes = np.load(model_dir / 'idf_hashes.npy', mmap_mode='r')
+            self.idf_values = np.load(model_dir / 'idf_values.npy', mmap_mode='r')
             with open(stats_path, 'r') as f:
                 self.entropy_stats = json.load(f)
-            logger.info("StylometryAnalyzer loaded models successfully.")
+            logger.info(f"StylometryAnalyzer loaded models successfully ({len(self.idf_hashes)} IDF terms).")
         except FileNotFoundError:
-            logger.warning(f"Stylometry models not found at {idf_path}. Running basic mode.")
+            self.idf_hashes = self.idf_values = None
+            logger.warning(f"Stylometry models not found in {model_dir}. Running basic mode.")
 
-    def _calculate_entropy(self, text: str):
+    @staticmethod
+    def _convert_legacy_idf(model_dir):
+        """
+        One-shot upgrade of a model directory that only has the pickled TfidfVectorizer (idf_vector.pkl)
+        to the memory-mapped IDF table. The old vectorizer was fitted with norm=None, so raw count x IDF
+        scores are unchanged. The pickle is left in place; scripts/build_stylometry_corpus.py no longer writes it.
+        """
+        legacy_path = model_dir / 'idf_vector.pkl'
+        hashes_path, values_path = model_dir / 'idf_hashes.npy', model_dir / 'idf_values.npy'
+        if hashes_path.exists() or not legacy_path.exists():
+            return
+        logger.warning(f"Converting legacy {legacy_path.name} to {hashes_path.name} / {values_path.name}.")
+        try:
+            with open(legacy_path, 'rb') as f:
+                vectorizer = pickle.load(f)
+            num_terms, _ = save_idf_table(vectorizer.get_feature_names_out(), vectorizer.idf_, hashes_path, values_path)
+        except Exception as e:
+            raise RuntimeError(
+                f"Could not convert {legacy_path} ({e}). Re-run scripts/build_stylometry_corpus.py to rebuild the stylometry models."
+            ) from e
+        logger.info(f"Converted {num_terms} IDF terms from {legacy_path.name}.")
+
+    @staticmethod
+    def _calculate_entropy(counts: Counter, total_tokens: int) -> float:
         """Tính Shannon Entropy của văn bản dựa trên phân phối từ."""
-        tokens = re.findall(r'\b\w+\b', text.lower())
-        if not tokens:
+        if not total_tokens:
             return 0
-        
-        counts = Counter(tokens)
-        total_tokens = len(tokens)
-        probabilities = [count / total_tokens for count in counts.values()]
+        probabilities = np.fromiter(counts.values(), dtype=np.float64, count=len(counts)) / total_tokens
+        return float(-np.sum(probabilities * np.log2(probabilities + 1e-12)))
 
-        entropy = -sum(p * math.log2(p + 1e-12) for p in probabilities)
-        return entropy
-
-    def analyze(self, text: str):
+    def _idf_weights(self, terms: list[str]) -> dict[str, float]:
+        """IDF weight of every term in `terms` found in the table, from one hash pass and one binary search."""
+        if not terms:
+            return {}
+        hashes = hash_terms(terms)
+        positions = np.searchsorted(self.idf_hashes, hashes)
+        positions[positions == len(self.idf_hashes)] = 0
+        known = self.idf_hashes[positions] == hashes
+        return dict(zip(compress(terms, known), self.idf_values[positions[known]].tolist()))
+
+    def _keyword_abuse_score(self, counts: Counter, idf_weights: dict[str, float]) -> float:
+        """Mean of the top-k TF-IDF weights (raw term count x IDF), computed over the terms present only."""
+        terms = [token for token in counts if len(token) > 1 and token in idf_weights]
+        scores = np.fromiter((counts[term] * idf_weights[term] for term in terms), dtype=np.float64, count=len(terms))
+        k = self.TOP_K_KEYWORDS
+        if scores.size < k:
+            # A dense TF-IDF row is zero everywhere else, so short rows are padded with zeros.
+            scores = np.pad(scores, (0, k - scores.size))
+        return float(np.mean(np.partition(scores, -k)[-k:]))
+
+    def extract_features(self, text: str) -> dict:
+        """All stylometric features of `text` from a single tokenization."""
+        return self.extract_features_batch([text])[0]
+
+    def extract_features_batch(self, texts: list[str]) -> list[dict]:
         """
-        Calculates a 'sensationalism score' based on multiple stylistic features.
+        `extract_features` for many texts. Each text is tokenized once, and the IDF table is searched
+        once for the vocabulary of the whole batch instead of once per text.
         """
-        if not text or not isinstance(text, str):
-            return {"sensationalism_score": 0.0, "reason": "Input text is empty or invalid."}
-
-        num_alpha_chars = sum(1 for c in text if c.isalpha())
-        if num_alpha_chars == 0:
+        batch = []
+        for text in texts:
+            counts = Counter(self.WORD_PATTERN.findall(text.lower()))
+            num_alpha_chars = sum(map(str.isalpha, text))
+            num_words = sum(counts.values())
+            sensational_count = sum(counts[word] for word in self.sensational_words.intersection(counts))
+            features = {
+                "num_alpha_chars": num_alpha_chars,
+                "upper_ratio": sum(map(str.isupper, text)) / num_alpha_chars if num_alpha_chars else 0,
+                "num_words": num_words,
+                "sensational_ratio": sensational_count / num_words if num_words > 0 else 0,
+                "entropy": None,
+                "keyword_abuse_score": 0,
+            }
+            batch.append((features, counts))
+
+        scored = [(features, counts) for features, counts in batch if self.idf_hashes is not None and features["num_words"] > 20]
+        if scored:
+            try:
+                vocabulary = list(set().union(*(counts for _, counts in scored)))
+                idf_weights = self._idf_weights([term for term in vocabulary if len(term) > 1])
+            except Exception as e:
+                logger.warning(f"Error calculating TF-IDF: {e}")
+                idf_weights = None
+            for features, counts in scored:
+                features["entropy"] = self._calculate_entropy(counts, features["num_words"])
+                if idf_weights is not None:
+                    features["keyword_abuse_score"] = self._keyword_abuse_score(counts, idf_weights)
+        return [features for features, _ in batch]
+
+    def _score(self, features: dict) -> dict:
+        if features["num_alpha_chars"] == 0:
             return {"sensationalism_score": 0.0, "reason": "No alphabetic characters to analyze."}
-        
-        num_uppers = sum(1 for c in text if c.isupper())
-        upper_ratio = num_uppers / num_alpha_chars
-        
-        words = re.findall(r'\b\w+\b', text.lower())
-        num_words = len(words)
-        sensational_count = sum(1 for word in words if word in self.sensational_words)
-        sensational_ratio = sensational_count / num_words if num_words > 0 else 0
 
+        upper_ratio = features["upper_ratio"]
+        sensational_ratio = features["sensational_ratio"]
+        keyword_abuse_score = features["keyword_abuse_score"]
         entropy_score = 0
-        keyword_abuse_score = 0
-        
-        if self.idf_vectorizer and num_words > 20:
-            entropy_value = self._calculate_entropy(text)
-
-            z_score = (entropy_value - self.entropy_stats['mean']) / self.entropy_stats['std']
+        if features["entropy"] is not None:
+            z_score = (features["entropy"] - self.entropy_stats['mean']) / self.entropy_stats['std']
+            entropy_score = max(0, -z_score)
 
-            entropy_score = max(0, -z_score) 
-
-            try:
-                tfidf_matrix = self.idf_vectorizer.transform([text])
-                top_tfidf_scores = np.sort(tfidf_matrix.toarray()[0])[-5:]
-                keyword_abuse_score = np.mean(top_tfidf_scores)
-            except Exception as e:
-                logger.warning(f"Error calculating TF-IDF: {e}")
-                keyword_abuse_score = 0
         final_score = (upper_ratio * 1.5) + \
                       (sensational_ratio * 3.0) + \
                       (entropy_score * 1.0) + \
@@ -237,6 +386,22 @@ class StylometryAnalyzer:
                   f"Keyword Abuse Score: {keyword_abuse_score:.2f}.")
         return {"sensationalism_score": final_score, "reason": reason}
 
+    def analyze(self, text: str):
+        """
+        Calculates a 'sensationalism score' based on multiple stylistic features.
+        """
+        return self.analyze_batch([text])[0]
+
+    def analyze_batch(self, texts: list[str]) -> list[dict]:
+        """`analyze` for many texts, sharing one IDF lookup across the batch (see `extract_features_batch`)."""
+        valid = [text for text in texts if text and isinstance(text, str)]
+        features_by_text = dict(zip(valid, self.extract_features_batch(valid)))
+        return [
+            self._score(features_by_text[text]) if text and isinstance(text, str)
+            else {"sensationalism_score": 0.0, "reason": "Input text is empty or invalid."}
+            for text in texts
+        ]
+
 
 class ScreeningAdvisor:
     def __init__(self, db_path=None, collection_name=None):
@@ -246,11 +411,27 @@ class ScreeningAdvisor:
             collection_name = config.get('vectordb.screening_collection_name')
         
         self.collection = None
+        self._count = None
+        self._count_checked_at = 0.0
+        # Hits are buffered and written at most once per lesson every COUNT_REFRESH_INTERVAL seconds.
+        self._pending_uses = Counter()
+        self._uses_written_at = {}
+        self._uses_lock = threading.Lock()
+        # Per-label lesson counts as (count, checked_at); only touched by the writer thread.
+        self._label_counts = {}
+        # Lessons and usage marks are written behind the request, in batches.
+        self.writer = BackgroundWriter(
+            self._write_batch, name="screening-writer", max_batch=LEARNING_MAX_BATCH, flush_interval=LEARNING_FLUSH_INTERVAL
+        )
 
         self.collection_name = collection_name
         try:
             client = chromadb.PersistentClient(path=db_path)
-            self.collection = client.get_collection(name=self.collection_name)
+            # Same embedding model the collection is created with (see scripts/manage_db.py).
+            self.collection = client.get_collection(
+                name=self.collection_name,
+                embedding_function=build_embedding_function(config.get('vectordb.embedding_model', 'intfloat/e5-base-v2'))
+            )
             logger.info(f"ScreeningAdvisor connected to '{self.collection_name}' collection.")
         except Exception as e:
             logger.warning(f"ScreeningAdvisor could not connect to ChromaDB collection '{collection_name}': {e}. Advisor will be inactive until collection is created.")
@@ -278,15 +459,20 @@ class ScreeningAdvisor:
             suggested_label = 'no_claims'
         elif num_claims > 0:
             is_opinion = True
+            num_with_evidences = 0
             for claim in claim_details:
                 if claim['factuality'] != "Nothing to check.":
                     evidences = claim.get('evidences', [])
                     if not evidences:
                         continue
+                    num_with_evidences += 1
                     all_irrelevant = all(evi.get('relationship') == 'IRRELEVANT' for evi in evidences)
                     if not all_irrelevant:
                         is_opinion = False
                         break
+            if num_with_evidences == 0:
+                # Nothing was actually judged (no evidences came back), so there is nothing to learn.
+                return
             if is_opinion:
                 suggested_label = 'opinion'
             else:
@@ -295,44 +481,189 @@ class ScreeningAdvisor:
         if suggested_label == 'unknown':
             return
 
+        self.writer.submit(("learn", self._truncate(text), suggested_label))
+
+    @staticmethod
+    def _truncate(text: str) -> str:
+        # The embedding model only reads the first few hundred tokens of a document anyway.
+        text = " ".join(text.split())
+        if len(text) <= LESSON_MAX_CHARS:
+            return text
+        cut = text.rfind(" ", 0, LESSON_MAX_CHARS)
+        return text[:cut if cut > 0 else LESSON_MAX_CHARS]
+
+    @staticmethod
+    def _lesson_id(text: str) -> str:
+        return "lesson-" + hashlib.sha256(text.casefold().encode("utf-8")).hexdigest()[:32]
+
+    def _mark_used(self, lesson_ids: list[str]):
+        if not lesson_ids:
+            return
+        now = time.monotonic()
+        with self._uses_lock:
+            self._pending_uses.update(lesson_ids)
+            due = {
+                lesson_id: self._pending_uses.pop(lesson_id)
+                for lesson_id in list(self._pending_uses)
+                if now - self._uses_written_at.get(lesson_id, float("-inf")) >= COUNT_REFRESH_INTERVAL
+            }
+            for lesson_id in due:
+                self._uses_written_at[lesson_id] = now
+        if due:
+            self.writer.submit(("use", due))
+
+    def _write_batch(self, items: list[tuple]):
+        if not self.collection:
+            return
+        now = time.time()
+
+        lessons = {}
+        uses = Counter()
+        for item in items:
+            if item[0] == "learn":
+                _, text, label = item
+                lessons[self._lesson_id(text)] = (text, label)
+            else:
+                uses.update(item[1])
+
+        touched_ids = list(set(lessons) | set(uses))
+        existing = self.collection.get(ids=touched_ids, include=["metadatas"]) if touched_ids else {"ids": [], "metadatas": []}
+        existing_meta = dict(zip(existing["ids"], existing["metadatas"]))
+
+        new_ids, new_docs, new_meta = [], [], []
+        update_ids, update_meta = [], []
+        for lesson_id, (text, label) in lessons.items():
+            if lesson_id in existing_meta:
+                # Same text learned again: keep its history, take the newest label.
+                meta = dict(existing_meta[lesson_id], label=label, last_used=now)
+                update_ids.append(lesson_id)
+                update_meta.append(meta)
+            else:
+                new_ids.append(lesson_id)
+                new_docs.append(text)
+                new_meta.append({"label": label, "created_at": now, "last_used": now, "hits": 0})
+        for lesson_id, count in uses.items():
+            if lesson_id in existing_meta and lesson_id not in lessons:
+                meta = existing_meta[lesson_id]
+                update_ids.append(lesson_id)
+                update_meta.append(dict(meta, hits=meta.get("hits", 0) + count, last_used=now))
+
+        try:
+            if new_ids:
+                self.collection.add(ids=new_ids, documents=new_docs, metadatas=new_meta)
+            if update_ids:
+                self.collection.update(ids=update_ids, metadatas=update_meta)
+            if new_ids:
+                self._count = None
+            if lessons:
+                logger.info(f"Learned {len(new_ids)} new lessons ({len(lessons) - len(new_ids)} already known).")
+        except Exception as e:
+            logger.error(f"Failed to save lessons to ScreeningKnowledgeDB: {e}")
+            return
+
+        added = Counter(meta["label"] for meta in new_meta)
+        for label, num_added in added.items():
+            if label in self._label_counts:
+                count, checked_at = self._label_counts[label]
+                self._label_counts[label] = (count + num_added, checked_at)
+        # Listing a label is O(lessons); only do it once a label can actually be over its limit.
+        if added and self._lesson_count() > LESSONS_PER_LABEL:
+            for label in added:
+                if self._label_count(label) > LESSONS_PER_LABEL:
+                    self._enforce_retention(label, protected=set(lessons))
+
+    def _label_count(self, label: str) -> int:
+        # Kept up to date with our own adds; re-listed every COUNT_REFRESH_INTERVAL to pick up other writers.
+        now = time.monotonic()
+        cached = self._label_counts.get(label)
+        if cached is None or now - cached[1] > COUNT_REFRESH_INTERVAL:
+            cached = (len(self.collection.get(where={"label": label}, include=[])["ids"]), now)
+            self._label_counts[label] = cached
+        return cached[0]
+
+    def _enforce_retention(self, label: str, protected: set = frozenset()):
+        """
+        Keeps at most LESSONS_PER_LABEL lessons per label, dropping the oldest or least-used ones.
+        Lessons in `protected` (just learned, so no hits yet) are never evicted.
+        """
         try:
-            unique_id = str(uuid.uuid4())
-            self.collection.add(
-                documents=[text],
-                metadatas=[{"label": suggested_label}],
-                ids=[unique_id]
-            )
-            logger.info(f"Learned a new lesson. Label: '{suggested_label}', Text: '{text[:50]}...'")
+            entries = self.collection.get(where={"label": label}, include=["metadatas"])
+            excess = len(entries["ids"]) - LESSONS_PER_LABEL
+            self._label_counts[label] = (len(entries["ids"]), time.monotonic())
+            if excess <= 0:
+                return
+            if LESSON_EVICTION == "oldest":
+                sort_key = lambda pair: pair[1].get("created_at", 0)  # noqa: E731
+            else:
+                sort_key = lambda pair: (pair[1].get("hits", 0), pair[1].get("last_used", 0))  # noqa: E731
+            candidates = [pair for pair in zip(entries["ids"], entries["metadatas"]) if pair[0] not in protected]
+            evicted = [lesson_id for lesson_id, _ in sorted(candidates, key=sort_key)[:excess]]
+            if not evicted:
+                return
+            self.collection.delete(ids=evicted)
+            self._count = None
+            self._label_counts[label] = (len(entries["ids"]) - len(evicted), time.monotonic())
+            logger.info(f"Evicted {len(evicted)} '{label}' lessons from ScreeningKnowledgeDB ({LESSON_EVICTION}).")
         except Exception as e:
-            logger.error(f"Failed to save a lesson to ScreeningKnowledgeDB: {e}")
+            logger.error(f"Failed to apply retention to ScreeningKnowledgeDB: {e}")
 
-    def get_advice(self, text: str, n_results: int = 3, threshold: float = 0.5) -> str:
-        if not self.collection or self.collection.count() == 0:
-            return 'no_knowledge'
+    def _lesson_count(self) -> int:
+        # count() is a full round trip to Chroma; it only needs to be fresh enough to skip an empty collection.
+        now = time.monotonic()
+        if self._count is None or now - self._count_checked_at > COUNT_REFRESH_INTERVAL:
+            self._count = self.collection.count()
+            self._count_checked_at = now
+        return self._count
+
+    def get_advice(self, text: str, n_results: int = ROUTING_NEIGHBOURS, threshold: float = ROUTING_MAX_DISTANCE) -> dict:
+        """
+        Distance-weighted vote of the nearest lessons within `threshold`. Returns the winning `label`,
+        its share of the vote as `confidence` and the number of `neighbours` that voted. When no vote
+        is possible the label is one of 'no_knowledge', 'no_match', 'too_dissimilar' or 'db_error'.
+        """
+        if not self.collection:
+            return {"label": "no_knowledge", "confidence": 0.0, "neighbours": 0}
 
         try:
+            count = self._lesson_count()
+            if count == 0:
+                return {"label": "no_knowledge", "confidence": 0.0, "neighbours": 0}
+
             results = self.collection.query(
-                query_texts=[text],
-                n_results=n_results,
+                query_texts=[self._truncate(text)],
+                n_results=min(n_results, count),
                 include=["metadatas", "distances"]
             )
             
             if not results or not results['ids'][0]:
-                return 'no_match'
+                return {"label": "no_match", "confidence": 0.0, "neighbours": 0}
 
-            distances = results['distances'][0]
-            metadatas = results['metadatas'][0]
-            
-            confident_results = [
-                metadatas[i]['label'] for i, dist in enumerate(distances) if dist < threshold
-            ]
-            
-            if not confident_results:
-                return 'too_dissimilar'
+            votes = Counter()
+            used_ids = []
+            for lesson_id, dist, metadata in zip(results['ids'][0], results['distances'][0], results['metadatas'][0]):
+                if dist < threshold:
+                    # Closer lessons count more; a lesson at the threshold counts for nothing.
+                    votes[metadata['label']] += 1.0 - dist / threshold
+                    used_ids.append(lesson_id)
+            self._mark_used(used_ids)
+
+            total = sum(votes.values())
+            if not used_ids or total <= 0:
+                return {"label": "too_dissimilar", "confidence": 0.0, "neighbours": len(used_ids)}
 
-            advice = max(set(confident_results), key=confident_results.count)
-            return advice
+            label, weight = votes.most_common(1)[0]
+            return {"label": label, "confidence": weight / total, "neighbours": len(used_ids)}
 
         except Exception as e:
             logger.error(f"Failed to get advice from ScreeningKnowledgeDB: {e}")
-            return 'db_error'
\ No newline at end of file
+            return {"label": "db_error", "confidence": 0.0, "neighbours": 0}
+
+    @staticmethod
+    def should_skip(advice: dict) -> bool:
+        """Routing policy (screening.routing): skip the pipeline only for confident, well-supported non-checkable labels."""
+        return (
+            ROUTING_ENABLED
+            and advice["label"] in ROUTING_SKIP_LABELS
+            and advice["confidence"] >= ROUTING_MIN_CONFIDENCE
+            and advice["neighbours"] >= ROUTING_MIN_NEIGHBOURS
+        )
@@ -0,0 +1,94 @@
+# ./factcheck/utils/background.py
+
+import os
+import time
+import queue
+import atexit
+import threading
+from factcheck.utils.logger import CustomLogger
+
+logger = CustomLogger(__name__).getlog()
+
+
+class BackgroundWriter:
+    """
+    Write-behind queue. `submit` returns immediately; a daemon thread hands queued items to
+    `flush_fn` in batches of up to `max_batch`, waiting at most `flush_interval` seconds to fill one.
+    Items still queued at interpreter exit get `shutdown_timeout` seconds to be written.
+    """
+
+    def __init__(self, flush_fn, name: str, max_batch: int = 32, flush_interval: float = 1.0,
+                 max_queue: int = 10000, shutdown_timeout: float = 10.0):
+        self.flush_fn = flush_fn
+        self.name = name
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.shutdown_timeout = shutdown_timeout
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self.stats = {"submitted": 0, "written": 0, "batches": 0, "dropped": 0, "errors": 0}
+        atexit.register(self.close)
+
+    def _ensure_thread(self):
+        # The worker thread does not survive a fork (e.g. Celery prefork), so start one per process.
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._queue = queue.Queue(maxsize=self.max_queue)
+                threading.Thread(target=self._run, name=self.name, daemon=True).start()
+
+    def submit(self, item) -> bool:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            logger.warning(f"Background writer '{self.name}' is full. Dropping one item.")
+            return False
+        self.stats["submitted"] += 1
+        return True
+
+    def _next_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self.flush_fn(batch)
+                self.stats["batches"] += 1
+                self.stats["written"] += len(batch)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Background writer '{self.name}' failed to write {len(batch)} items: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Blocks until everything submitted so far has been written. Returns False on timeout."""
+        if self._pid != os.getpid():
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self):
+        if not self.flush(timeout=self.shutdown_timeout):
+            logger.warning(f"Background writer '{self.name}' exited with unwritten items.")
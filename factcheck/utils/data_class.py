@@ -3,7 +3,7 @@
 from collections import Counter
 from typing import Dict, List, Any, Optional
 from enum import Enum
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, field
 
 
 @dataclass
@@ -29,6 +29,7 @@ class Evidence:
     url: str = None
     reasoning: str = None
     relationship: str = None
+    votes: Dict[str, str] = field(default_factory=dict)
 
     def attribute_check(self) -> bool:
         for field in self.__dataclass_fields__.values():
@@ -52,6 +53,18 @@ class ClaimDetail:
     evidences: List[dict] = None
     factuality: any = None
 
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ClaimDetail":
+        fields = {k: v for k, v in data.items() if k in cls.__dataclass_fields__}
+        fields["evidences"] = [
+            Evidence(**{k: v for k, v in e.items() if k in Evidence.__dataclass_fields__}) if isinstance(e, dict) else e
+            for e in fields.get("evidences") or []
+        ]
+        return cls(**fields)
+
     def attribute_check(self) -> bool:
         for field in self.__dataclass_fields__.values():
             if getattr(self, field.name) is None:
@@ -87,6 +100,7 @@ class FactCheckOutput:
     raw_text: str = None
     token_count: int = None
     usage: PipelineUsage = None
+    council_stats: dict = None
     claim_detail: List[ClaimDetail] = None
     summary: FCSummary = None
     final_report: str = None
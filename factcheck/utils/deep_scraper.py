@@ -1,51 +1,116 @@
 # factcheck/utils/deep_scraper.py
 
+import os
+import time
+import atexit
+import threading
 import trafilatura
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from factcheck.utils.page_cache import get_page_cache
+from factcheck.utils.web_util import USER_AGENT
+from factcheck.utils.config_loader import config
 from factcheck.utils.logger import CustomLogger
 
 logger = CustomLogger(__name__).getlog()
 
+SCRAPE_TIMEOUT = config.get('scraper.timeout', 10)
+SCRAPE_BATCH_TIMEOUT = config.get('scraper.batch_timeout', 15)
+SCRAPE_MAX_BYTES = config.get('scraper.max_bytes', 524288)
+
+
+_executors = {}
+_executors_pid = None
+_executors_lock = threading.Lock()
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Download pool shared by every scraper with this pool size. Worker threads do not survive a fork
+    (e.g. Celery prefork), so each process gets its own pools."""
+    global _executors_pid
+    with _executors_lock:
+        if _executors_pid != os.getpid():
+            _executors.clear()
+            _executors_pid = os.getpid()
+        if max_workers not in _executors:
+            _executors[max_workers] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="deep-scraper")
+        return _executors[max_workers]
+
+
+def shutdown_executors():
+    with _executors_lock:
+        if _executors_pid == os.getpid():
+            for executor in _executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+        _executors.clear()
+
+
+atexit.register(shutdown_executors)
+
 
 class DeepScraper:
-    def __init__(self, max_workers: int = 5):
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+    """
+    Full-text extraction for a batch of URLs. Downloads are streamed and capped at `max_bytes`, and
+    `scrape_batch` returns whatever finished within `batch_timeout` seconds instead of waiting for the slowest site.
+    """
 
-    def scrape_url(self, url: str, max_chars: int = 3000) -> str | None:
+    def __init__(self, max_workers: int = 5, batch_timeout: float = SCRAPE_BATCH_TIMEOUT, max_bytes: int = SCRAPE_MAX_BYTES):
+        self.max_workers = max_workers
+        self.batch_timeout = batch_timeout
+        self.max_bytes = max_bytes
+
+    def scrape_url(self, url: str, max_chars: int = 3000, timeout: float = SCRAPE_TIMEOUT, deadline: float = None) -> str | None:
         try:
-            downloaded = trafilatura.fetch_url(url)
-            if not downloaded:
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    return None
+            page_cache = get_page_cache()
+            page = page_cache.fetch(
+                url, headers={"User-Agent": USER_AGENT}, timeout=timeout, max_bytes=self.max_bytes, deadline=deadline
+            )
+            if not page.html:
                 return None
-            
-            text = trafilatura.extract(downloaded, include_comments=False, include_tables=False)
-            
+
+            # The full extraction is kept with the cached page; only the returned copy is truncated.
+            text = page_cache.get_text(
+                page, "trafilatura", lambda html: trafilatura.extract(html, include_comments=False, include_tables=False)
+            )
+
             if not text:
                 return None
 
             if len(text) > max_chars:
                 text = text[:max_chars] + "... [Content Truncated]"
-            
+
             return text
         except Exception as e:
             logger.warning(f"Deep scraping failed for {url}: {e}")
             return None
 
-    def scrape_batch(self, urls: list[str]) -> dict[str, str]:
+    def scrape_batch(self, urls: list[str], timeout: float = None) -> dict[str, str]:
+        """Scrapes `urls` in parallel and returns the contents that were ready within the batch deadline."""
         if not urls:
             return {}
-        
+
+        urls = list(dict.fromkeys(urls))
         logger.info(f"Deep scraping {len(urls)} URLs in parallel...")
+        deadline = time.monotonic() + (timeout or self.batch_timeout)
+        executor = _get_executor(self.max_workers)
+        futures = {executor.submit(self.scrape_url, url, deadline=deadline): url for url in urls}
+
         results = {}
-        
-        futures = {self.executor.submit(self.scrape_url, url): url for url in urls}
-        
-        for future in futures:
-            url = futures[future]
-            try:
-                content = future.result()
-                if content:
-                    results[url] = content
-            except Exception:
-                continue
-                
-        return results
\ No newline at end of file
+        try:
+            for future in as_completed(futures, timeout=max(0.0, deadline - time.monotonic())):
+                try:
+                    content = future.result()
+                    if content:
+                        results[futures[future]] = content
+                except Exception:
+                    continue
+        except FuturesTimeoutError:
+            pending = [url for future, url in futures.items() if not future.done()]
+            for future in futures:
+                future.cancel()
+            logger.warning(f"Deep scraping deadline reached; skipped {len(pending)} slow URLs: {pending}")
+
+        return results
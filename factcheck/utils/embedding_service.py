@@ -0,0 +1,166 @@
+# ./factcheck/utils/embedding_service.py
+
+import os
+import queue
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+from factcheck.utils.inference import load_sentence_transformer
+from factcheck.utils.config_loader import config
+from factcheck.utils.logger import CustomLogger
+
+logger = CustomLogger(__name__).getlog()
+
+BATCH_SIZE = config.get('embedding.batch_size', 64)
+MAX_WAIT_MS = config.get('embedding.max_wait_ms', 5)
+MEMO_SIZE = config.get('embedding.memo_size', 20000)
+
+
+class _EncodeRequest:
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.embeddings = None
+        self.error = None
+
+
+class EmbeddingModel:
+    """
+    One sentence-transformer shared by every component of the process. Concurrent `encode` calls
+    are merged into micro-batches by a background thread, and embeddings are memoized by text hash.
+    """
+
+    def __init__(self, model_name: str, backend: str = None, batch_size: int = BATCH_SIZE,
+                 max_wait_ms: float = MAX_WAIT_MS, memo_size: int = MEMO_SIZE):
+        self.model_name = model_name
+        self.model = load_sentence_transformer(model_name, backend=backend)
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self.stats = {"texts": 0, "memo_hits": 0, "batches": 0, "encoded": 0}
+
+    @staticmethod
+    def _text_key(text: str) -> bytes:
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def _ensure_batcher(self):
+        # The batcher thread does not survive a fork (e.g. Celery prefork), so restart it per process.
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._requests = queue.Queue()
+                threading.Thread(target=self._run_batcher, name=f"embed-{self.model_name}", daemon=True).start()
+
+    def _next_batch(self) -> list[_EncodeRequest]:
+        batch = [self._requests.get()]
+        num_texts = len(batch[0].texts)
+        while num_texts < self.batch_size:
+            try:
+                request = self._requests.get(timeout=self.max_wait)
+            except queue.Empty:
+                break
+            batch.append(request)
+            num_texts += len(request.texts)
+        return batch
+
+    def _run_batcher(self):
+        while True:
+            batch = self._next_batch()
+            texts = [text for request in batch for text in request.texts]
+            try:
+                embeddings = self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True, show_progress_bar=False)
+                self.stats["batches"] += 1
+                self.stats["encoded"] += len(texts)
+                offset = 0
+                for request in batch:
+                    request.embeddings = embeddings[offset : offset + len(request.texts)]
+                    offset += len(request.texts)
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+            for request in batch:
+                request.done.set()
+
+    def encode(self, texts: list[str] | str, normalize_embeddings: bool = False) -> np.ndarray:
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        if not texts:
+            return np.empty((0, self.model.get_sentence_embedding_dimension() or 0), dtype=np.float32)
+        keys = [self._text_key(text) for text in texts]
+        self.stats["texts"] += len(texts)
+
+        found = {}
+        with self._memo_lock:
+            for key in keys:
+                if key in self._memo:
+                    self._memo.move_to_end(key)
+                    found[key] = self._memo[key]
+        self.stats["memo_hits"] += sum(1 for key in keys if key in found)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        if missing:
+            self._ensure_batcher()
+            request = _EncodeRequest(list(missing.values()))
+            self._requests.put(request)
+            request.done.wait()
+            if request.error is not None:
+                raise request.error
+            with self._memo_lock:
+                for key, embedding in zip(missing.keys(), request.embeddings):
+                    found[key] = embedding
+                    self._memo[key] = embedding
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+
+        embeddings = np.stack([found[key] for key in keys])
+        if normalize_embeddings:
+            embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_embedding_model(model_name: str, backend: str = None) -> EmbeddingModel:
+    """Returns the process-wide instance of `model_name`, loading it on first use."""
+    key = (model_name, backend)
+    with _registry_lock:
+        if key not in _registry:
+            logger.info(f"Loading shared embedding model '{model_name}'...")
+            _registry[key] = EmbeddingModel(model_name, backend=backend)
+        return _registry[key]
+
+
+def build_embedding_function(model_name: str, normalize_embeddings: bool = False):
+    """
+    Chroma embedding function backed by the shared model. It presents itself as Chroma's own
+    sentence-transformer function so collections created with that function keep validating.
+    """
+    from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+
+    class SharedEmbeddingFunction(SentenceTransformerEmbeddingFunction):
+        def __init__(self):
+            # Chroma's __init__ would load a private copy of the model, so it is deliberately not called.
+            self.model_name = model_name
+            self.device = "cpu"
+            self.normalize_embeddings = normalize_embeddings
+            self.kwargs = {}
+
+        @property
+        def embedder(self) -> EmbeddingModel:
+            # Resolved on first use, so components that are only built are not charged a model load.
+            return get_embedding_model(model_name)
+
+        def __call__(self, input):
+            return self.embedder.encode(list(input), normalize_embeddings=self.normalize_embeddings).tolist()
+
+    return SharedEmbeddingFunction()
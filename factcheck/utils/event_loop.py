@@ -0,0 +1,48 @@
+# ./factcheck/utils/event_loop.py
+
+import os
+import asyncio
+import threading
+from factcheck.utils.logger import CustomLogger
+
+logger = CustomLogger(__name__).getlog()
+
+_shared_loop = None
+_shared_loop_pid = None
+_shared_loop_lock = threading.Lock()
+
+
+def get_shared_loop() -> asyncio.AbstractEventLoop:
+    """Returns the long-lived event loop of this worker process, started on a daemon thread on first use."""
+    global _shared_loop, _shared_loop_pid
+    with _shared_loop_lock:
+        # A forked Celery worker inherits the loop object but not the thread running it.
+        if _shared_loop is None or _shared_loop.is_closed() or _shared_loop_pid != os.getpid():
+            _shared_loop = asyncio.new_event_loop()
+            _shared_loop_pid = os.getpid()
+            thread = threading.Thread(target=_shared_loop.run_forever, name="factcheck-event-loop", daemon=True)
+            thread.start()
+            logger.info(f"Started shared asyncio event loop for process {_shared_loop_pid}.")
+        return _shared_loop
+
+
+def run_coroutine(coro, timeout: float = None):
+    """
+    Runs `coro` on the shared loop and blocks the calling thread until it finishes.
+    If the caller gives up (timeout, KeyboardInterrupt, task revoked) the coroutine is cancelled.
+    """
+    loop = get_shared_loop()
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is loop:
+        coro.close()
+        raise RuntimeError("run_coroutine() cannot block the shared event loop; await the coroutine instead.")
+
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout=timeout)
+    except BaseException:
+        future.cancel()
+        raise
@@ -0,0 +1,250 @@
+# ./factcheck/utils/http_client.py
+
+import os
+import time
+import socket
+import atexit
+import asyncio
+import ipaddress
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import httpx
+import httpcore
+from factcheck.utils.config_loader import config
+from factcheck.utils.logger import CustomLogger
+
+logger = CustomLogger(__name__).getlog()
+
+HTTP2_ENABLED = config.get('http.http2', True)
+MAX_CONNECTIONS = config.get('http.max_connections', 100)
+MAX_KEEPALIVE_CONNECTIONS = config.get('http.max_keepalive_connections', 20)
+PER_HOST_LIMIT = config.get('http.per_host_limit', 6)
+DNS_CACHE_TTL = config.get('http.dns_cache_ttl', 300)
+DNS_CACHE_SIZE = config.get('http.dns_cache_size', 1024)
+CONNECT_TIMEOUT = config.get('http.timeout.connect', 3)
+READ_TIMEOUT = config.get('http.timeout.read', 10)
+RETRIES = config.get('http.retries', 2)
+
+try:
+    import h2  # noqa: F401
+except ImportError:
+    if HTTP2_ENABLED:
+        logger.warning("Package 'h2' not installed. The shared HTTP client falls back to HTTP/1.1.")
+    HTTP2_ENABLED = False
+
+
+class DNSCache:
+    """Bounded LRU of resolved addresses per (host, port), each kept for `ttl` seconds."""
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL, max_entries: int = DNS_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, host: str, port: int) -> list[str] | None:
+        with self._lock:
+            entry = self._entries.get((host, port))
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[(host, port)]
+                return None
+            self._entries.move_to_end((host, port))
+            return entry[1]
+
+    def put(self, host: str, port: int, addresses: list[str]):
+        with self._lock:
+            self._entries[(host, port)] = (time.monotonic() + self.ttl, addresses)
+            self._entries.move_to_end((host, port))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _is_ip_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+def _unique_addresses(infos) -> list[str]:
+    return list(dict.fromkeys(info[4][0] for info in infos))
+
+
+_dns_cache = DNSCache()
+
+
+class CachedDNSBackend(httpcore.SyncBackend):
+    """Network backend that resolves hostnames through `_dns_cache`; TLS still verifies the original hostname."""
+
+    def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        if _is_ip_address(host):
+            return super().connect_tcp(host, port, timeout, local_address, socket_options)
+        addresses = _dns_cache.get(host, port)
+        if addresses is None:
+            try:
+                addresses = _unique_addresses(socket.getaddrinfo(host, port, type=socket.SOCK_STREAM))
+            except OSError as e:
+                raise httpcore.ConnectError(str(e)) from e
+            _dns_cache.put(host, port, addresses)
+        error = None
+        for address in addresses:
+            try:
+                return super().connect_tcp(address, port, timeout, local_address, socket_options)
+            except httpcore.ConnectError as e:
+                error = e
+        raise error or httpcore.ConnectError(f"No addresses for {host}")
+
+
+class AsyncCachedDNSBackend(httpcore.AnyIOBackend):
+    """Async counterpart of CachedDNSBackend for the shared event loop."""
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        if _is_ip_address(host):
+            return await super().connect_tcp(host, port, timeout, local_address, socket_options)
+        addresses = _dns_cache.get(host, port)
+        if addresses is None:
+            try:
+                infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+            except OSError as e:
+                raise httpcore.ConnectError(str(e)) from e
+            addresses = _unique_addresses(infos)
+            _dns_cache.put(host, port, addresses)
+        error = None
+        for address in addresses:
+            try:
+                return await super().connect_tcp(address, port, timeout, local_address, socket_options)
+            except httpcore.ConnectError as e:
+                error = e
+        raise error or httpcore.ConnectError(f"No addresses for {host}")
+
+
+def _use_dns_cache(transport):
+    """
+    Points the transport's connection pool at the caching backend. httpx has no public option for the
+    network backend, so this sets httpcore's `_network_backend` and leaves DNS uncached if that goes away.
+    """
+    if not DNS_CACHE_TTL:
+        return transport
+    pool = getattr(transport, "_pool", None)
+    if pool is None or not hasattr(pool, "_network_backend"):
+        logger.warning("httpx/httpcore internals changed; DNS lookups are not cached.")
+        return transport
+    is_async = isinstance(transport, httpx.AsyncHTTPTransport)
+    pool._network_backend = AsyncCachedDNSBackend() if is_async else CachedDNSBackend()
+    return transport
+
+
+def build_timeout(timeout: float = None) -> httpx.Timeout:
+    if timeout is None:
+        return httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+    return httpx.Timeout(timeout, connect=min(timeout, CONNECT_TIMEOUT))
+
+
+class HttpPool:
+    """
+    Process-wide pooled HTTP clients shared by every fetcher: connection reuse, HTTP/2,
+    a per-host concurrency limit and cached DNS lookups (scoped to these clients' transports).
+    """
+    _pid = None
+    _lock = threading.Lock()
+    _sync_client = None
+    _async_client = None
+    _sync_host_limits = {}
+    _async_host_limits = {}
+
+    @classmethod
+    def _check_fork(cls):
+        # Sockets must not be shared with a parent process (e.g. Celery prefork workers).
+        if cls._pid != os.getpid():
+            cls._pid = os.getpid()
+            cls._sync_client = None
+            cls._async_client = None
+            cls._sync_host_limits = {}
+            cls._async_host_limits = {}
+            # The cache lock may have been held by another thread at fork time.
+            global _dns_cache
+            _dns_cache = DNSCache()
+
+    @classmethod
+    def _limits(cls) -> httpx.Limits:
+        return httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS)
+
+    @classmethod
+    def get_sync_client(cls) -> httpx.Client:
+        with cls._lock:
+            cls._check_fork()
+            if cls._sync_client is None:
+                transport = _use_dns_cache(httpx.HTTPTransport(retries=RETRIES, http2=HTTP2_ENABLED, limits=cls._limits()))
+                cls._sync_client = httpx.Client(transport=transport, timeout=build_timeout(), follow_redirects=True)
+            return cls._sync_client
+
+    @classmethod
+    def get_async_client(cls) -> httpx.AsyncClient:
+        """Must be used from the shared event loop (see factcheck.utils.event_loop)."""
+        with cls._lock:
+            cls._check_fork()
+            if cls._async_client is None:
+                transport = _use_dns_cache(
+                    httpx.AsyncHTTPTransport(retries=RETRIES, http2=HTTP2_ENABLED, limits=cls._limits())
+                )
+                cls._async_client = httpx.AsyncClient(transport=transport, timeout=build_timeout(), follow_redirects=True)
+            return cls._async_client
+
+    @classmethod
+    def sync_host_limit(cls, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc
+        with cls._lock:
+            if host not in cls._sync_host_limits:
+                cls._sync_host_limits[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+            return cls._sync_host_limits[host]
+
+    @classmethod
+    def async_host_limit(cls, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        with cls._lock:
+            if host not in cls._async_host_limits:
+                cls._async_host_limits[host] = asyncio.Semaphore(PER_HOST_LIMIT)
+            return cls._async_host_limits[host]
+
+    @classmethod
+    def close(cls):
+        if cls._sync_client is not None and cls._pid == os.getpid():
+            cls._sync_client.close()
+            cls._sync_client = None
+
+
+atexit.register(HttpPool.close)
+
+
+def http_request(method: str, url: str, headers: dict = None, timeout: float = None, **kwargs) -> httpx.Response:
+    client = HttpPool.get_sync_client()
+    with HttpPool.sync_host_limit(url):
+        return client.request(method, url, headers=headers, timeout=build_timeout(timeout), **kwargs)
+
+
+def http_get(url: str, headers: dict = None, timeout: float = None, **kwargs) -> httpx.Response:
+    return http_request("GET", url, headers=headers, timeout=timeout, **kwargs)
+
+
+@contextmanager
+def http_stream(method: str, url: str, headers: dict = None, timeout: float = None, **kwargs):
+    """Streaming request: the body is read by the caller (e.g. up to a byte cap) and the connection released on exit."""
+    client = HttpPool.get_sync_client()
+    with HttpPool.sync_host_limit(url):
+        with client.stream(method, url, headers=headers, timeout=build_timeout(timeout), **kwargs) as response:
+            yield response
+
+
+async def ahttp_request(method: str, url: str, headers: dict = None, timeout: float = None, **kwargs) -> httpx.Response:
+    client = HttpPool.get_async_client()
+    async with HttpPool.async_host_limit(url):
+        return await client.request(method, url, headers=headers, timeout=build_timeout(timeout), **kwargs)
+
+
+async def ahttp_get(url: str, headers: dict = None, timeout: float = None, **kwargs) -> httpx.Response:
+    return await ahttp_request("GET", url, headers=headers, timeout=timeout, **kwargs)
@@ -0,0 +1,97 @@
+# ./factcheck/utils/inference.py
+
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from factcheck.utils.config_loader import config, PROJECT_ROOT
+from factcheck.utils.logger import CustomLogger
+
+logger = CustomLogger(__name__).getlog()
+
+INFERENCE_BACKEND = config.get('inference.backend', 'torch')
+ONNX_QUANTIZE = config.get('inference.onnx.quantize', True)
+ONNX_QUANTIZATION_CONFIG = config.get('inference.onnx.quantization_config', 'avx2')
+ONNX_CACHE_DIR = PROJECT_ROOT / config.get('inference.onnx.cache_dir', 'models/onnx')
+QUANTIZED_SUFFIX = "qint8"
+
+_export_lock = threading.Lock()
+
+
+def get_device() -> str:
+    import torch
+
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _find_onnx_file(model_dir: Path, quantized: bool) -> str | None:
+    file_name = f"model_{QUANTIZED_SUFFIX}.onnx" if quantized else "model.onnx"
+    matches = sorted(model_dir.rglob(file_name))
+    return str(matches[0].relative_to(model_dir)) if matches else None
+
+
+def export_onnx(model_cls, model_name: str, **kwargs) -> tuple[str, dict]:
+    """
+    Exports `model_name` to ONNX (int8 dynamic quantization unless disabled) under `inference.onnx.cache_dir`,
+    once per host. Returns the local model path and the keyword arguments that load the exported file.
+    The export is written to a private temporary directory and renamed into place, so processes that export
+    concurrently (e.g. prefork workers) never see a half-written model; the first rename wins.
+    """
+    model_dir = ONNX_CACHE_DIR / model_name.replace("/", "__")
+    with _export_lock:
+        file_name = _find_onnx_file(model_dir, ONNX_QUANTIZE)
+        if file_name is None:
+            ONNX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_dir = Path(tempfile.mkdtemp(prefix=f".{model_dir.name}-", dir=ONNX_CACHE_DIR))
+            try:
+                logger.info(f"Exporting '{model_name}' to ONNX in {model_dir} (quantize={ONNX_QUANTIZE})...")
+                model = model_cls(model_name, backend="onnx", **kwargs)
+                model.save_pretrained(str(tmp_dir))
+                if ONNX_QUANTIZE:
+                    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+                    export_dynamic_quantized_onnx_model(
+                        model, ONNX_QUANTIZATION_CONFIG, str(tmp_dir), file_suffix=QUANTIZED_SUFFIX
+                    )
+                if _find_onnx_file(tmp_dir, ONNX_QUANTIZE) is None:
+                    raise FileNotFoundError(f"ONNX export of '{model_name}' produced no model file in {tmp_dir}.")
+                # A leftover export without the requested variant is replaced; a complete one from another process is kept.
+                if model_dir.exists() and _find_onnx_file(model_dir, ONNX_QUANTIZE) is None:
+                    shutil.rmtree(model_dir, ignore_errors=True)
+                try:
+                    os.replace(tmp_dir, model_dir)
+                except OSError:
+                    logger.info(f"'{model_name}' was exported concurrently by another process; using that copy.")
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            file_name = _find_onnx_file(model_dir, ONNX_QUANTIZE)
+            if file_name is None:
+                raise FileNotFoundError(f"ONNX export of '{model_name}' produced no model file in {model_dir}.")
+    return str(model_dir), {"backend": "onnx", "model_kwargs": {"file_name": file_name}}
+
+
+def _load(model_cls, model_name: str, backend: str = None, **kwargs):
+    backend = backend or INFERENCE_BACKEND
+    if backend == "onnx":
+        try:
+            model_path, onnx_kwargs = export_onnx(model_cls, model_name, **kwargs)
+            model = model_cls(model_path, **onnx_kwargs, **kwargs)
+            logger.info(f"Loaded '{model_name}' with ONNX Runtime ({onnx_kwargs['model_kwargs']['file_name']}).")
+            return model
+        except Exception as e:
+            logger.warning(f"ONNX backend unavailable for '{model_name}': {e}. Falling back to PyTorch.")
+    return model_cls(model_name, **kwargs)
+
+
+def load_sentence_transformer(model_name: str, backend: str = None, **kwargs):
+    from sentence_transformers import SentenceTransformer
+
+    return _load(SentenceTransformer, model_name, backend, **kwargs)
+
+
+def load_cross_encoder(model_name: str, backend: str = None, **kwargs):
+    from sentence_transformers import CrossEncoder
+
+    return _load(CrossEncoder, model_name, backend, **kwargs)
+
@@ -0,0 +1,284 @@
+# ./factcheck/utils/kv_cache.py
+
+import os
+import time
+import sqlite3
+import threading
+from dataclasses import dataclass
+from factcheck.utils.logger import CustomLogger
+from factcheck.utils.config_loader import config, PROJECT_ROOT
+
+logger = CustomLogger(__name__).getlog()
+
+
+@dataclass
+class CacheEntry:
+    value: str | bytes = None
+    created_at: float = None
+    expires_at: float = None
+
+    @property
+    def is_stale(self) -> bool:
+        return self.expires_at is not None and time.time() > self.expires_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+
+class BaseKVCache:
+    """
+    Key-value cache shared between workers. Entries live for `ttl` seconds and are kept
+    `stale_ttl` seconds longer so callers can serve them while revalidating.
+    Cache failures are logged and treated as misses; they never break the caller.
+    """
+
+    def __init__(self, namespace: str, ttl: float = None, stale_ttl: float = 0):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.stats = {"hits": 0, "misses": 0, "stale_hits": 0, "sets": 0, "evictions": 0, "errors": 0}
+
+    def _expiry(self, ttl: float = None) -> float | None:
+        ttl = self.ttl if ttl is None else ttl
+        return time.time() + ttl if ttl else None
+
+    def _get(self, key: str) -> CacheEntry | None:
+        raise NotImplementedError
+
+    def _set(self, key: str, value, expires_at: float | None):
+        raise NotImplementedError
+
+    def _delete(self, key: str):
+        raise NotImplementedError
+
+    def get_entry(self, key: str, allow_stale: bool = False) -> CacheEntry | None:
+        try:
+            entry = self._get(key)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Cache '{self.namespace}' read failed: {e}")
+            entry = None
+
+        if entry is None or (entry.is_stale and not allow_stale):
+            self.stats["misses"] += 1
+            return None
+        if entry.is_stale:
+            self.stats["stale_hits"] += 1
+        else:
+            self.stats["hits"] += 1
+        return entry
+
+    def get(self, key: str):
+        entry = self.get_entry(key)
+        return entry.value if entry else None
+
+    def set(self, key: str, value, ttl: float = None):
+        try:
+            self._set(key, value, self._expiry(ttl))
+            self.stats["sets"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Cache '{self.namespace}' write failed: {e}")
+
+    def delete(self, key: str):
+        try:
+            self._delete(key)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Cache '{self.namespace}' delete failed: {e}")
+
+    def get_stats(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] + self.stats["stale_hits"]) / lookups if lookups else 0.0
+        return {**self.stats, "hit_rate": hit_rate}
+
+
+class NullKVCache(BaseKVCache):
+    def _get(self, key: str):
+        return None
+
+    def _set(self, key: str, value, expires_at: float | None):
+        pass
+
+    def _delete(self, key: str):
+        pass
+
+
+class SQLiteKVCache(BaseKVCache):
+    """On-disk cache in one SQLite file (WAL mode), safe to share between processes on the same host."""
+
+    EVICTION_CHECK_INTERVAL = 100
+    ACCESS_UPDATE_INTERVAL = 60
+
+    def __init__(self, namespace: str, path: str, ttl: float = None, stale_ttl: float = 0,
+                 max_entries: int = None, max_bytes: int = None):
+        super().__init__(namespace, ttl, stale_ttl)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._sets_since_check = 0
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = self._conn()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS kv_cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_kv_cache_access ON kv_cache (namespace, last_access)')
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key: str) -> CacheEntry | None:
+        conn = self._conn()
+        row = conn.execute(
+            'SELECT value, created_at, expires_at, last_access FROM kv_cache WHERE namespace = ? AND key = ?',
+            (self.namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, created_at, expires_at, last_access = row
+        now = time.time()
+        if expires_at is not None and now > expires_at + self.stale_ttl:
+            self._delete(key)
+            return None
+        # LRU bookkeeping is approximate to keep reads from turning into writes.
+        if now - last_access > self.ACCESS_UPDATE_INTERVAL:
+            conn.execute('UPDATE kv_cache SET last_access = ? WHERE namespace = ? AND key = ?', (now, self.namespace, key))
+            conn.commit()
+        return CacheEntry(value=value, created_at=created_at, expires_at=expires_at)
+
+    def _set(self, key: str, value, expires_at: float | None):
+        now = time.time()
+        size = len(value) if value is not None else 0
+        conn = self._conn()
+        conn.execute(
+            'INSERT OR REPLACE INTO kv_cache (namespace, key, value, size, created_at, expires_at, last_access) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (self.namespace, key, value, size, now, expires_at, now)
+        )
+        conn.commit()
+
+        self._sets_since_check += 1
+        if self._sets_since_check >= self.EVICTION_CHECK_INTERVAL:
+            self._sets_since_check = 0
+            self.evict()
+
+    def _delete(self, key: str):
+        conn = self._conn()
+        conn.execute('DELETE FROM kv_cache WHERE namespace = ? AND key = ?', (self.namespace, key))
+        conn.commit()
+
+    def evict(self):
+        """Drops expired entries, then least-recently-used ones until the size limits hold."""
+        conn = self._conn()
+        cursor = conn.execute(
+            'DELETE FROM kv_cache WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at + ? < ?',
+            (self.namespace, self.stale_ttl, time.time())
+        )
+        evicted = cursor.rowcount
+
+        count, total_bytes = conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM kv_cache WHERE namespace = ?', (self.namespace,)
+        ).fetchone()
+
+        excess = 0
+        if self.max_entries and count > self.max_entries:
+            excess = count - self.max_entries
+        if self.max_bytes and total_bytes > self.max_bytes:
+            # Assume average entry size to turn the byte overshoot into a row count.
+            avg_size = total_bytes / max(count, 1)
+            excess = max(excess, int((total_bytes - self.max_bytes) / max(avg_size, 1)) + 1)
+        if excess > 0:
+            cursor = conn.execute(
+                'DELETE FROM kv_cache WHERE namespace = ? AND key IN '
+                '(SELECT key FROM kv_cache WHERE namespace = ? ORDER BY last_access ASC LIMIT ?)',
+                (self.namespace, self.namespace, excess)
+            )
+            evicted += cursor.rowcount
+        conn.commit()
+
+        if evicted:
+            self.stats["evictions"] += evicted
+            logger.info(f"Cache '{self.namespace}' evicted {evicted} entries.")
+
+
+class RedisKVCache(BaseKVCache):
+    """Cache shared by every worker that can reach the Redis server. Size limits are left to Redis' maxmemory policy."""
+
+    def __init__(self, namespace: str, url: str, ttl: float = None, stale_ttl: float = 0):
+        super().__init__(namespace, ttl, stale_ttl)
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = f"failsafe:{namespace}:"
+
+    def _get(self, key: str) -> CacheEntry | None:
+        data = self.client.hgetall(self.prefix + key)
+        if not data:
+            return None
+        value = data[b"v"]
+        if data.get(b"t") == b"s":
+            value = value.decode("utf-8")
+        expires_at = float(data[b"e"]) if data.get(b"e") else None
+        return CacheEntry(value=value, created_at=float(data[b"c"]), expires_at=expires_at)
+
+    def _set(self, key: str, value, expires_at: float | None):
+        is_text = isinstance(value, str)
+        mapping = {
+            "v": value.encode("utf-8") if is_text else value,
+            "t": "s" if is_text else "b",
+            "c": time.time(),
+            "e": expires_at or "",
+        }
+        pipe = self.client.pipeline()
+        pipe.hset(self.prefix + key, mapping=mapping)
+        if expires_at:
+            pipe.expireat(self.prefix + key, int(expires_at + self.stale_ttl) + 1)
+        pipe.execute()
+
+    def _delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+
+def build_kv_cache(namespace: str, **overrides) -> BaseKVCache:
+    """
+    Builds the cache for `namespace` from the `cache` section of config.yaml.
+    Per-namespace settings (ttl, stale_ttl, max_entries, max_bytes) live under `cache.<namespace>`.
+    """
+    settings = dict(config.get(f'cache.{namespace}', {}))
+    settings.update(overrides)
+    backend = settings.pop('backend', None) or config.get('cache.backend', 'sqlite')
+    ttl = settings.get('ttl')
+    stale_ttl = settings.get('stale_ttl', 0)
+
+    try:
+        if backend == 'redis':
+            url = config.get('cache.redis_url', 'redis://localhost:6379/1')
+            return RedisKVCache(namespace, url, ttl=ttl, stale_ttl=stale_ttl)
+        if backend == 'sqlite':
+            path = str(PROJECT_ROOT / config.get('cache.sqlite_path', 'data/cache.db'))
+            return SQLiteKVCache(
+                namespace, path, ttl=ttl, stale_ttl=stale_ttl,
+                max_entries=settings.get('max_entries'), max_bytes=settings.get('max_bytes'),
+            )
+    except Exception as e:
+        logger.error(f"Failed to initialize '{backend}' cache for '{namespace}': {e}. Caching disabled.")
+    return NullKVCache(namespace)
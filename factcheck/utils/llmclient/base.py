@@ -1,14 +1,20 @@
 # ./factcheck/utils/llmclient/base.py
 
+import copy
 import time
 import asyncio
 import json
+import hashlib
 import logging
+import threading
 from abc import abstractmethod
-from functools import partial, lru_cache
-from collections import deque
+from contextlib import nullcontext
 
 from ..data_class import TokenUsage
+from ..event_loop import run_coroutine
+from ..config_loader import config
+from ..kv_cache import build_kv_cache
+from .rate_limiter import RateLimitScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -20,28 +26,101 @@ class BaseClient:
         api_config: dict,
         max_requests_per_minute: int,
         request_window: int,
+        max_tokens_per_minute: int = None,
+        rate_limit_keys: list[str] = None,
+        max_rate_limit_retries: int = 5,
+        max_concurrency: int = None,
     ) -> None:
         self.model = model
         self.api_config = api_config
         self.max_requests_per_minute = max_requests_per_minute
         self.request_window = request_window
-        self.traffic_queue = deque()
-        self.total_traffic = 0
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self.rate_limiter = RateLimitScheduler(
+            keys=rate_limit_keys or ["default"],
+            requests_per_minute=max_requests_per_minute,
+            tokens_per_minute=max_tokens_per_minute,
+            model_limits=config.get('llm.rate_limits', {}),
+        )
+        self.response_cache = build_kv_cache('llm')
         self.usage = TokenUsage(model=model)
+        # Streaming stages call one client from several worker threads.
+        self._usage_lock = threading.Lock()
 
     @staticmethod
     def _make_hashable(data):
         return json.dumps(data, sort_keys=True)
 
-    @lru_cache(maxsize=256)
-    def _cached_call_wrapper(self, messages_hashable: str, **kwargs):
-        messages = json.loads(messages_hashable)
-        return self._call(messages, **kwargs)
+    def _cache_key(self, messages: list, **kwargs) -> str:
+        """Content hash of everything that changes the response: model, messages, seed and schema."""
+        key_data = {
+            "model": self.model,
+            "messages": messages,
+            "seed": kwargs.get("seed", 42),
+            "schema_type": kwargs.get("schema_type"),
+        }
+        return hashlib.sha256(self._make_hashable(key_data).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _is_cacheable(response, schema_type: str = None) -> bool:
+        """Empty answers are never kept; structured (schema_type) answers only when they are a complete JSON object."""
+        if not response or response.strip() == "{}":
+            return False
+        if schema_type is None:
+            return True
+        try:
+            return isinstance(json.loads(response), dict)
+        except (json.JSONDecodeError, TypeError):
+            return False
+
+    def forget(self, messages: list, **kwargs):
+        """Drops the cached response for one conversation, for callers whose parsing rejected it."""
+        self.response_cache.delete(self._cache_key(messages, **kwargs))
+
+    @staticmethod
+    def _is_rate_limit_error(error: Exception) -> bool:
+        return getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429
+
+    def _limited_call(self, messages: list, **kwargs):
+        tokens = self.get_request_length(messages)
+        for _ in range(self.max_rate_limit_retries):
+            key = self.rate_limiter.acquire_blocking(self.model, tokens)
+            try:
+                r = self._call(messages, api_key=key, estimated_tokens=tokens, **kwargs)
+            except Exception as e:
+                if not self._is_rate_limit_error(e):
+                    raise
+                self.rate_limiter.report_exhausted(key, self.model)
+                continue
+            self.rate_limiter.report_success(key, self.model)
+            return r
+        raise RuntimeError(f"Rate limit retries exhausted for model '{self.model}'.")
+
+    async def _alimited_call(self, messages: list, **kwargs):
+        tokens = self.get_request_length(messages)
+        for _ in range(self.max_rate_limit_retries):
+            key = await self.rate_limiter.acquire(self.model, tokens)
+            try:
+                r = await self._acall(messages, api_key=key, estimated_tokens=tokens, **kwargs)
+            except Exception as e:
+                if not self._is_rate_limit_error(e):
+                    raise
+                self.rate_limiter.report_exhausted(key, self.model)
+                continue
+            self.rate_limiter.report_success(key, self.model)
+            return r
+        raise RuntimeError(f"Rate limit retries exhausted for model '{self.model}'.")
 
     @abstractmethod
     def _call(self, messages: list, **kwargs):
         pass
-    
+
+    async def _acall(self, messages: list, **kwargs):
+        """Native async request. Clients without an async SDK fall back to a worker thread."""
+        return await asyncio.to_thread(self._call, messages, **kwargs)
+
     @abstractmethod
     def _log_usage(self, usage_dict):
         pass
@@ -49,75 +128,109 @@ class BaseClient:
     def get_usage(self):
         return self.usage
 
+    def add_usage(self, prompt_tokens: int, completion_tokens: int):
+        with self._usage_lock:
+            self.usage.prompt_tokens += prompt_tokens
+            self.usage.completion_tokens += completion_tokens
+
     def reset_usage(self):
-        self.usage.prompt_tokens = 0
-        self.usage.completion_tokens = 0
+        with self._usage_lock:
+            self.usage.prompt_tokens = 0
+            self.usage.completion_tokens = 0
+
+    def with_own_usage(self):
+        """Copy of this client sharing its API clients, rate limiter and response cache, but counting tokens on its own."""
+        clone = copy.copy(self)
+        clone.usage = TokenUsage(model=self.model)
+        clone._usage_lock = threading.Lock()
+        return clone
 
     @abstractmethod
     def construct_message_list(self, prompt_list: list[str]) -> list[str]:
         raise NotImplementedError
 
-    @abstractmethod
     def get_request_length(self, messages):
-        raise NotImplementedError
+        """Rough prompt size in tokens (~4 characters per token), charged against the tokens-per-minute budget."""
+        num_chars = sum(len(str(msg.get("content", ""))) for msg in messages)
+        return num_chars // 4 + 1
 
     def call(self, messages: list[str], num_retries=3, waiting_time=1, **kwargs):
         seed = kwargs.get("seed", 42)
         assert type(seed) is int, "Seed must be an integer."
         assert len(messages) == 1, "Only one message is allowed for this function."
 
-        hashable_messages = self._make_hashable(messages[0])
-        
+        cache_key = self._cache_key(messages[0], **kwargs)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         r = ""
         for _ in range(num_retries):
             try:
-                r = self._cached_call_wrapper(hashable_messages, seed=seed)
+                r = self._limited_call(messages[0], **kwargs)
                 if r:
                     break
             except Exception as e:
                 print(f"Error LLM Client call: {e} Retrying...")
-                self._cached_call_wrapper.cache_clear() 
                 time.sleep(waiting_time)
 
         if r == "":
             raise ValueError("Failed to get response from LLM Client.")
+        if self._is_cacheable(r, kwargs.get("schema_type")):
+            self.response_cache.set(cache_key, r)
         return r
 
     def set_model(self, model: str):
         self.model = model
 
-    async def _async_call(self, messages: list, **kwargs):
-        while True:  
-            self._expire_old_traffic()
-            
-            if len(self.traffic_queue) < self.max_requests_per_minute:
-                break 
-          
-            oldest_request_time = self.traffic_queue[0][0]
-            time_to_wait = (oldest_request_time + self.request_window) - time.time()
-
-            wait_duration = max(0, time_to_wait) + 0.1
-            logger.debug(f"Rate limit reached. Waiting for {wait_duration:.2f} seconds...")
-            await asyncio.sleep(wait_duration)
-
-        loop = asyncio.get_running_loop()
-        hashable_messages = self._make_hashable(messages)
-        
-        self.traffic_queue.append((time.time(), self.get_request_length(messages)))
-        self.total_traffic += self.get_request_length(messages)
-        
-        response = await loop.run_in_executor(None, partial(self._cached_call_wrapper, hashable_messages, **kwargs))
-
-        return response
+    def _in_flight_limit(self):
+        """Caps requests in flight on the shared loop; unlimited unless `max_concurrency` is set."""
+        if not self.max_concurrency:
+            return nullcontext()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def acall(self, messages: list, num_retries=3, waiting_time=1, **kwargs):
+        """Async counterpart of `call` for a single conversation (one element of `construct_message_list`)."""
+        seed = kwargs.get("seed", 42)
+        assert type(seed) is int, "Seed must be an integer."
+
+        cache_key = self._cache_key(messages, **kwargs)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        for _ in range(num_retries):
+            try:
+                async with self._in_flight_limit():
+                    r = await self._alimited_call(messages, **kwargs)
+                if r:
+                    if self._is_cacheable(r, kwargs.get("schema_type")):
+                        self.response_cache.set(cache_key, r)
+                    return r
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Error LLM Client acall: {e} Retrying...")
+                await asyncio.sleep(waiting_time)
+
+        raise ValueError("Failed to get response from LLM Client.")
+
+    async def _acall_or_empty(self, messages: list, **kwargs):
+        try:
+            return await self.acall(messages, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"LLM request failed after retries: {e}")
+            return ""
+
+    async def amulti_call(self, messages_list, **kwargs):
+        """Sends every conversation concurrently. A request that keeps failing yields an empty string."""
+        tasks = [self._acall_or_empty(messages, **kwargs) for messages in messages_list]
+        return await asyncio.gather(*tasks)
 
     def multi_call(self, messages_list, **kwargs):
-        tasks = [self._async_call(messages=messages, **kwargs) for messages in messages_list]
-        asyncio.set_event_loop(asyncio.SelectorEventLoop())
-        loop = asyncio.get_event_loop()
-        responses = loop.run_until_complete(asyncio.gather(*tasks))
-        return responses
-
-    def _expire_old_traffic(self):
-        current_time = time.time()
-        while self.traffic_queue and self.traffic_queue[0][0] + self.request_window < current_time:
-            self.total_traffic -= self.traffic_queue.popleft()[1]
\ No newline at end of file
+        return run_coroutine(self.amulti_call(messages_list, **kwargs))
+
@@ -1,7 +1,7 @@
 # ./factcheck/utils/llmclient/claude_client.py
 
 import time
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 from .base import BaseClient
 
 
@@ -15,6 +15,7 @@ class ClaudeClient(BaseClient):
     ):
         super().__init__(model, api_config, max_requests_per_minute, request_window)
         self.client = Anthropic(api_key=self.api_config["ANTHROPIC_API_KEY"])
+        self.aclient = AsyncAnthropic(api_key=self.api_config["ANTHROPIC_API_KEY"])
 
     def _call(self, messages: str, **kwargs):
         response = self.client.messages.create(
@@ -24,8 +25,13 @@ class ClaudeClient(BaseClient):
         )
         return response.content[0].text
 
-    def get_request_length(self, messages):
-        return 1
+    async def _acall(self, messages: str, **kwargs):
+        response = await self.aclient.messages.create(
+            messages=messages,
+            model=self.model,
+            max_tokens=2048,
+        )
+        return response.content[0].text
 
     def construct_message_list(
         self,
@@ -5,8 +5,8 @@ import threading
 from itertools import cycle
 from .base import BaseClient
 from factcheck.utils.logger import CustomLogger
-import backoff
 from google.api_core import exceptions
+from google.ai import generativelanguage as glm
 from google.ai.generativelanguage_v1beta.types import content
 
 logger = CustomLogger(__name__).getlog()
@@ -32,8 +32,31 @@ VERIFICATION_SCHEMA = content.Schema(
     },
     required=["verifications"],
 )
+BATCH_VERIFICATION_SCHEMA = content.Schema(
+    type=content.Type.OBJECT,
+    properties={
+        "verifications": content.Schema(
+            type=content.Type.ARRAY,
+            items=content.Schema(
+                type=content.Type.OBJECT,
+                properties={
+                    "claim_id": content.Schema(type=content.Type.STRING),
+                    "id": content.Schema(type=content.Type.STRING),
+                    "reasoning": content.Schema(type=content.Type.STRING),
+                    "relationship": content.Schema(
+                        type=content.Type.STRING,
+                        enum=["SUPPORTS", "REFUTES", "IRRELEVANT"]
+                    ),
+                },
+                required=["claim_id", "id", "reasoning", "relationship"],
+            ),
+        ),
+    },
+    required=["verifications"],
+)
 SCHEMA_MAP = {
-    "verification": VERIFICATION_SCHEMA
+    "verification": VERIFICATION_SCHEMA,
+    "batch_verification": BATCH_VERIFICATION_SCHEMA,
 }
 
 
@@ -44,21 +67,29 @@ class GeminiClient(BaseClient):
         api_config: dict = None,
         max_requests_per_minute=40, 
         request_window=60,
+        max_tokens_per_minute=None,
     ):
-        super().__init__(model, api_config, max_requests_per_minute, request_window)
-
-        if "GEMINI_KEY_POOL" in self.api_config and self.api_config["GEMINI_KEY_POOL"]:
-            self.key_pool = self.api_config["GEMINI_KEY_POOL"]
-        elif "GEMINI_API_KEY" in self.api_config and self.api_config["GEMINI_API_KEY"]:
-            self.key_pool = [self.api_config["GEMINI_API_KEY"]]
+        if "GEMINI_KEY_POOL" in api_config and api_config["GEMINI_KEY_POOL"]:
+            self.key_pool = api_config["GEMINI_KEY_POOL"]
+        elif "GEMINI_API_KEY" in api_config and api_config["GEMINI_API_KEY"]:
+            self.key_pool = [api_config["GEMINI_API_KEY"]]
         else:
             raise ValueError("No GEMINI_API_KEYS found in configuration.")
 
+        # Limits apply per key: the scheduler spreads requests over the whole pool.
+        super().__init__(
+            model, api_config, max_requests_per_minute, request_window,
+            max_tokens_per_minute=max_tokens_per_minute,
+            rate_limit_keys=self.key_pool,
+        )
+
         logger.info(f"GeminiClient initialized with {len(self.key_pool)} API keys available.")
         
         self.key_cycle = cycle(self.key_pool)
         
-        self.config_lock = threading.Lock()
+        self.clients_lock = threading.Lock()
+        self.sync_clients = {}
+        self.async_clients = {}
 
         self.default_generation_config = genai.types.GenerationConfig(
             response_mime_type="application/json"
@@ -67,52 +98,91 @@ class GeminiClient(BaseClient):
     def _get_next_key(self):
         return next(self.key_cycle)
 
-    @backoff.on_exception(
-        backoff.expo,
-        exceptions.ResourceExhausted, 
-        max_tries=5,
-        max_time=120
-    )
-    def _call(self, messages: list, **kwargs):
-        current_key = self._get_next_key()
-        
-        schema_type = kwargs.get("schema_type")
-        
+    def _get_sync_client(self, api_key: str):
+        """One transport per key, so concurrent requests never share the global `genai.configure` state."""
+        with self.clients_lock:
+            if api_key not in self.sync_clients:
+                self.sync_clients[api_key] = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+            return self.sync_clients[api_key]
+
+    def _get_async_client(self, api_key: str):
+        with self.clients_lock:
+            if api_key not in self.async_clients:
+                self.async_clients[api_key] = glm.GenerativeServiceAsyncClient(client_options={"api_key": api_key})
+            return self.async_clients[api_key]
+
+    def _build_model(self, gen_config, client_attr: str, client):
+        """
+        GenerativeModel bound to a per-key transport. `genai.configure` is process-global, so the transport is
+        set on the SDK's `_client` / `_async_client` attributes instead (google-generativeai is pinned to 0.8.x
+        in requirements.txt). Fails loudly rather than silently falling back to the global key if they go away.
+        """
+        model_instance = genai.GenerativeModel(model_name=self.model, generation_config=gen_config)
+        if not hasattr(model_instance, client_attr):
+            raise RuntimeError(
+                f"google-generativeai {genai.__version__} has no GenerativeModel.{client_attr}; "
+                "per-key Gemini clients need the SDK version pinned in requirements.txt."
+            )
+        setattr(model_instance, client_attr, client)
+        return model_instance
+
+    def _get_generation_config(self, schema_type: str = None):
         if schema_type and schema_type in SCHEMA_MAP:
-            gen_config = genai.types.GenerationConfig(
+            return genai.types.GenerationConfig(
                 response_mime_type="application/json",
                 response_schema=SCHEMA_MAP[schema_type]
             )
-        else:
-            gen_config = self.default_generation_config
+        return self.default_generation_config
+
+    def _handle_response(self, response, current_key: str, estimated_tokens: int = None) -> str:
+        if hasattr(response, 'usage_metadata'):
+            self._log_usage(response.usage_metadata)
+            if estimated_tokens is not None:
+                actual_tokens = getattr(response.usage_metadata, "total_token_count", 0)
+                if actual_tokens:
+                    self.rate_limiter.record_usage(current_key, self.model, estimated_tokens, actual_tokens)
+
+        if not response.parts:
+            logger.warning(f"Gemini (Key ...{current_key[-4:]}) returned empty response.")
+            return "{}"
+
+        return response.text
+
+    def _call(self, messages: list, **kwargs):
+        current_key = kwargs.get("api_key") or self._get_next_key()
+        gen_config = self._get_generation_config(kwargs.get("schema_type"))
 
         try:
             full_prompt = "\n".join([msg['content'] for msg in messages])
             
-            response = None
-            with self.config_lock:
-                genai.configure(api_key=current_key)
-                model_instance = genai.GenerativeModel(
-                    model_name=self.model,
-                    generation_config=gen_config 
-                )
-                response = model_instance.generate_content(full_prompt)
-
-            if hasattr(response, 'usage_metadata'):
-                self._log_usage(response.usage_metadata)
-            
-            if not response.parts:
-                logger.warning(f"Gemini (Key ...{current_key[-4:]}) returned empty response.")
-                return "{}"
+            model_instance = self._build_model(gen_config, "_client", self._get_sync_client(current_key))
+            response = model_instance.generate_content(full_prompt)
 
-            return response.text
+            return self._handle_response(response, current_key, kwargs.get("estimated_tokens"))
 
+        except exceptions.ResourceExhausted:
+            raise
         except Exception as e:
             logger.error(f"Error calling Gemini with key ...{current_key[-4:]}: {e}")
             raise e 
 
-    def get_request_length(self, messages):
-        return 1
+    async def _acall(self, messages: list, **kwargs):
+        current_key = kwargs.get("api_key") or self._get_next_key()
+        gen_config = self._get_generation_config(kwargs.get("schema_type"))
+
+        try:
+            full_prompt = "\n".join([msg['content'] for msg in messages])
+
+            model_instance = self._build_model(gen_config, "_async_client", self._get_async_client(current_key))
+            response = await model_instance.generate_content_async(full_prompt)
+
+            return self._handle_response(response, current_key, kwargs.get("estimated_tokens"))
+
+        except exceptions.ResourceExhausted:
+            raise
+        except Exception as e:
+            logger.error(f"Error calling Gemini (async) with key ...{current_key[-4:]}: {e}")
+            raise e
 
     def construct_message_list(
         self,
@@ -128,7 +198,6 @@ class GeminiClient(BaseClient):
 
     def _log_usage(self, usage_dict):
         try:
-            self.usage.prompt_tokens += usage_dict.prompt_token_count
-            self.usage.completion_tokens += usage_dict.candidates_token_count
+            self.add_usage(usage_dict.prompt_token_count, usage_dict.candidates_token_count)
         except Exception:
             pass
\ No newline at end of file
@@ -1,7 +1,7 @@
 # ./factcheck/utils/llmclient/gpt_client.py
 
 import time
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from .base import BaseClient
 
 
@@ -15,6 +15,7 @@ class GPTClient(BaseClient):
     ):
         super().__init__(model, api_config, max_requests_per_minute, request_window)
         self.client = OpenAI(api_key=self.api_config["OPENAI_API_KEY"])
+        self.aclient = AsyncOpenAI(api_key=self.api_config["OPENAI_API_KEY"])
 
     def _call(self, messages: str, **kwargs):
         seed = kwargs.get("seed", 42)  
@@ -35,16 +36,31 @@ class GPTClient(BaseClient):
 
         return r
 
+    async def _acall(self, messages: str, **kwargs):
+        seed = kwargs.get("seed", 42)
+        assert type(seed) is int, "Seed must be an integer."
+
+        response = await self.aclient.chat.completions.create(
+            response_format={"type": "json_object"},
+            seed=seed,
+            model=self.model,
+            messages=messages,
+        )
+        r = response.choices[0].message.content
+
+        if hasattr(response, "usage"):
+            self._log_usage(usage_dict=response.usage)
+        else:
+            print("Warning: ChatGPT API Usage is not logged.")
+
+        return r
+
     def _log_usage(self, usage_dict):
         try:
-            self.usage.prompt_tokens += usage_dict.prompt_tokens
-            self.usage.completion_tokens += usage_dict.completion_tokens
+            self.add_usage(usage_dict.prompt_tokens, usage_dict.completion_tokens)
         except:  # noqa E722
             print("Warning: prompt_tokens or completion_token not found in usage_dict")
 
-    def get_request_length(self, messages):
-        return 1
-
     def construct_message_list(
         self,
         prompt_list: list[str],
@@ -2,7 +2,7 @@
 
 import time
 import openai
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from .base import BaseClient
 
 
@@ -22,6 +22,7 @@ class LocalOpenAIClient(BaseClient):
 
         openai.api_key = api_config["LOCAL_API_KEY"]
         openai.base_url = api_config["LOCAL_API_URL"]
+        self.aclient = AsyncOpenAI(api_key=api_config["LOCAL_API_KEY"], base_url=api_config["LOCAL_API_URL"])
 
     def _call(self, messages: str, **kwargs):
         seed = kwargs.get("seed", 42) 
@@ -36,8 +37,17 @@ class LocalOpenAIClient(BaseClient):
         r = response.choices[0].message.content
         return r
 
-    def get_request_length(self, messages):
-        return 1
+    async def _acall(self, messages: str, **kwargs):
+        seed = kwargs.get("seed", 42)
+        assert type(seed) is int, "Seed must be an integer."
+
+        response = await self.aclient.chat.completions.create(
+            response_format={"type": "json_object"},
+            seed=seed,
+            model=self.model,
+            messages=messages,
+        )
+        return response.choices[0].message.content
 
     def construct_message_list(
         self,
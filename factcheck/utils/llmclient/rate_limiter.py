@@ -0,0 +1,159 @@
+# ./factcheck/utils/llmclient/rate_limiter.py
+
+import time
+import asyncio
+import threading
+from factcheck.utils.logger import CustomLogger
+
+logger = CustomLogger(__name__).getlog()
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, per_seconds: float = 60.0):
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / per_seconds
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def headroom(self, now: float) -> float:
+        self._refill(now)
+        return self.level / self.capacity
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # A request larger than the whole bucket is let through once the bucket is full.
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.refill_rate
+
+    def consume(self, amount: float):
+        self.level -= amount
+
+
+class _KeyState:
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int = None):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.blocked_until = 0.0
+        self.strikes = 0
+        self.stats = {"requests": 0, "tokens": 0, "exhausted": 0}
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        wait = max(self.blocked_until - now, self.requests.wait_time(1, now))
+        if self.tokens:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return wait
+
+    def headroom(self, now: float) -> float:
+        headroom = self.requests.headroom(now)
+        if self.tokens:
+            headroom = min(headroom, self.tokens.headroom(now))
+        return headroom
+
+
+class RateLimitScheduler:
+    """
+    Tracks requests-per-minute and tokens-per-minute for every (API key, model) pair and
+    routes each request to the key with the most headroom. A key that reports quota
+    exhaustion (HTTP 429 / ResourceExhausted) is backed off on its own.
+    """
+
+    def __init__(
+        self,
+        keys: list[str],
+        requests_per_minute: int,
+        tokens_per_minute: int = None,
+        model_limits: dict = None,
+        backoff_base: float = 5.0,
+        backoff_max: float = 120.0,
+    ):
+        self.keys = list(keys) or ["default"]
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.model_limits = model_limits or {}
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def _state(self, key: str, model: str) -> _KeyState:
+        state = self._states.get((key, model))
+        if state is None:
+            limits = self.model_limits.get(model, {})
+            state = _KeyState(
+                limits.get("requests_per_minute", self.requests_per_minute),
+                limits.get("tokens_per_minute", self.tokens_per_minute),
+            )
+            self._states[(key, model)] = state
+        return state
+
+    def _try_acquire(self, model: str, tokens: int) -> tuple[str | None, float]:
+        with self._lock:
+            now = time.monotonic()
+            best_key, best_headroom, min_wait = None, -1.0, float("inf")
+            for key in self.keys:
+                state = self._state(key, model)
+                wait = state.wait_time(tokens, now)
+                if wait > 0:
+                    min_wait = min(min_wait, wait)
+                    continue
+                headroom = state.headroom(now)
+                if headroom > best_headroom:
+                    best_key, best_headroom = key, headroom
+
+            if best_key is None:
+                return None, min_wait
+
+            state = self._state(best_key, model)
+            state.requests.consume(1)
+            if state.tokens:
+                state.tokens.consume(tokens)
+            state.stats["requests"] += 1
+            state.stats["tokens"] += tokens
+            return best_key, 0.0
+
+    async def acquire(self, model: str, tokens: int = 1) -> str:
+        while True:
+            key, wait = self._try_acquire(model, tokens)
+            if key is not None:
+                return key
+            logger.debug(f"All keys for '{model}' are at their limit. Waiting {wait:.2f}s...")
+            await asyncio.sleep(wait + 0.05)
+
+    def acquire_blocking(self, model: str, tokens: int = 1) -> str:
+        while True:
+            key, wait = self._try_acquire(model, tokens)
+            if key is not None:
+                return key
+            logger.debug(f"All keys for '{model}' are at their limit. Waiting {wait:.2f}s...")
+            time.sleep(wait + 0.05)
+
+    def record_usage(self, key: str, model: str, estimated_tokens: int, actual_tokens: int):
+        """Corrects the token bucket once the provider reports the real token count."""
+        with self._lock:
+            state = self._state(key, model)
+            if state.tokens:
+                state.tokens.consume(actual_tokens - estimated_tokens)
+            state.stats["tokens"] += actual_tokens - estimated_tokens
+
+    def report_success(self, key: str, model: str):
+        with self._lock:
+            self._state(key, model).strikes = 0
+
+    def report_exhausted(self, key: str, model: str, retry_after: float = None):
+        with self._lock:
+            state = self._state(key, model)
+            state.strikes += 1
+            state.stats["exhausted"] += 1
+            delay = retry_after or min(self.backoff_max, self.backoff_base * (2 ** (state.strikes - 1)))
+            state.blocked_until = time.monotonic() + delay
+        logger.warning(f"Key ...{key[-4:]} exhausted its quota for '{model}'. Backing it off for {delay:.1f}s.")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {f"...{key[-4:]}|{model}": dict(state.stats) for (key, model), state in self._states.items()}
@@ -0,0 +1,269 @@
+# ./factcheck/utils/page_cache.py
+
+import os
+import json
+import asyncio
+import zlib
+import time
+import threading
+from dataclasses import dataclass, field, asdict
+from email.utils import formatdate
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import httpx
+from factcheck.utils.kv_cache import build_kv_cache
+from factcheck.utils.http_client import http_request, http_stream, ahttp_request
+from factcheck.utils.config_loader import config
+from factcheck.utils.logger import CustomLogger
+
+logger = CustomLogger(__name__).getlog()
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZSTD_LEVEL = config.get('cache.pages.zstd_level', 3)
+CACHEABLE_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "igshid", "ref_src")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Codec tag in front of every stored page, so entries stay readable if zstandard comes or goes.
+_ZSTD, _ZLIB = b"Z", b"z"
+
+
+def canonical_url(url: str) -> str:
+    """Cache key form of `url`: lower-case scheme and host, no default port, fragment or tracking parameters, sorted query."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def _compress(data: bytes) -> bytes:
+    if zstandard is not None:
+        return _ZSTD + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return _ZLIB + zlib.compress(data, 6)
+
+
+def _decompress(blob: bytes) -> bytes:
+    codec, payload = blob[:1], blob[1:]
+    if codec == _ZSTD:
+        if zstandard is None:
+            raise ValueError("page was stored with zstd but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return zlib.decompress(payload)
+
+
+@dataclass
+class CachedPage:
+    url: str
+    final_url: str
+    html: str
+    encoding: str = None
+    etag: str = None
+    last_modified: str = None
+    fetched_at: float = None
+    # When this body was downloaded. Unlike fetched_at it survives 304 revalidations, so cached texts can be matched to it.
+    version: float = None
+    # Extracted text per extractor name (e.g. "visible", "trafilatura"), filled in by the consumers.
+    # Stored under their own keys, not with the page, so adding one does not rewrite the HTML.
+    texts: dict = field(default_factory=dict)
+    # Byte cap the download stopped at, or None for a complete page.
+    truncated_at: int = None
+    cacheable: bool = True
+    from_cache: bool = False
+
+
+class PageCache:
+    """
+    On-disk cache of fetched HTML pages shared by every scraper, keyed by canonical URL and stored compressed.
+    Entries are fresh for `cache.pages.ttl`; after that they are revalidated with ETag / Last-Modified and
+    served as-is if the origin cannot be reached. Total size is bounded by `cache.pages.max_bytes` (LRU).
+    """
+
+    def __init__(self):
+        # Always SQLite: pages are too large for the shared Redis instance.
+        self.store = build_kv_cache('pages', backend='sqlite')
+        self.stats = {"hits": 0, "revalidated": 0, "fetched": 0, "stale_served": 0}
+
+    def _load(self, url: str, max_bytes: int = None):
+        entry = self.store.get_entry(canonical_url(url), allow_stale=True)
+        if entry is None:
+            return None, False
+        try:
+            page = CachedPage(**json.loads(_decompress(entry.value)))
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cached page for {url}: {e}")
+            self.store.delete(canonical_url(url))
+            return None, False
+        if page.truncated_at is not None and (max_bytes is None or max_bytes > page.truncated_at):
+            # A capped download cannot stand in for a request that wants more of the page.
+            return None, False
+        page.from_cache = True
+        return page, entry.is_stale
+
+    def _save(self, page: CachedPage):
+        data = asdict(page)
+        data.pop("from_cache")
+        data.pop("texts")
+        self.store.set(canonical_url(page.url), _compress(json.dumps(data).encode("utf-8")))
+
+    @staticmethod
+    def _text_key(page: CachedPage, extractor: str) -> str:
+        # Canonical URLs never contain a fragment, so these keys cannot collide with page keys.
+        return f"{canonical_url(page.url)}#text:{extractor}"
+
+    @staticmethod
+    def _conditional_headers(page: CachedPage | None, headers: dict = None) -> dict:
+        headers = dict(headers or {})
+        if page is not None:
+            if page.etag:
+                headers["If-None-Match"] = page.etag
+            if page.last_modified:
+                headers["If-Modified-Since"] = page.last_modified
+            elif page.fetched_at:
+                headers["If-Modified-Since"] = formatdate(page.fetched_at, usegmt=True)
+        return headers
+
+    def _resolve(self, url: str, cached: CachedPage | None, response: httpx.Response | None, error: Exception = None,
+                 html: str = None, truncated_at: int = None) -> CachedPage:
+        """
+        Turns the (conditional) response into a page, storing it. Falls back to the stale copy on failure.
+        `html` is passed for streamed responses, whose body has been read by the caller.
+        """
+        if response is not None and response.status_code == 304 and cached is not None:
+            self.stats["revalidated"] += 1
+            cached.fetched_at = time.time()
+            self._save(cached)
+            return cached
+
+        if response is not None and response.status_code == 200:
+            content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+            now = time.time()
+            page = CachedPage(
+                url=url, final_url=str(response.url), html=response.text if html is None else html,
+                encoding=response.encoding, etag=response.headers.get("etag"),
+                last_modified=response.headers.get("last-modified"), fetched_at=now, version=now, truncated_at=truncated_at,
+            )
+            self.stats["fetched"] += 1
+            page.cacheable = not content_type or content_type in CACHEABLE_CONTENT_TYPES
+            if page.cacheable:
+                self._save(page)
+            return page
+
+        if cached is not None:
+            self.stats["stale_served"] += 1
+            logger.info(f"Serving stale cached page for {url} (revalidation failed).")
+            return cached
+        if error is not None:
+            raise error
+        response.raise_for_status()
+        raise httpx.HTTPStatusError(f"Unexpected status {response.status_code} for {url}", request=response.request, response=response)
+
+    def _download_capped(self, url: str, cached: CachedPage | None, headers: dict, timeout: float,
+                         max_bytes: int, deadline: float = None) -> CachedPage:
+        """Streams the body and stops after `max_bytes`, or raises a timeout once `deadline` (monotonic) has passed."""
+        with http_stream("GET", url, headers=headers, timeout=timeout) as response:
+            if response.status_code != 200:
+                response.read()
+                return self._resolve(url, cached, response)
+            chunks, size = [], 0
+            for chunk in response.iter_bytes():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= max_bytes:
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    raise httpx.ReadTimeout(f"Download of {url} exceeded its deadline.", request=response.request)
+            truncated_at = max_bytes if size >= max_bytes else None
+            html = b"".join(chunks)[:max_bytes].decode(response.encoding or "utf-8", errors="replace")
+        return self._resolve(url, cached, response, html=html, truncated_at=truncated_at)
+
+    def fetch(self, url: str, headers: dict = None, timeout: float = None, max_bytes: int = None,
+              deadline: float = None) -> CachedPage:
+        """
+        Page for `url` from the cache, revalidated or downloaded as needed. Raises httpx.HTTPError if none can be had.
+        With `max_bytes` the download is streamed and cut off at that size (the page is marked `truncated_at`).
+        """
+        cached, is_stale = self._load(url, max_bytes)
+        if cached is not None and not is_stale:
+            self.stats["hits"] += 1
+            return cached
+        request_headers = self._conditional_headers(cached, headers)
+        try:
+            if max_bytes:
+                return self._download_capped(url, cached, request_headers, timeout, max_bytes, deadline)
+            response = http_request("GET", url, headers=request_headers, timeout=timeout)
+        except httpx.HTTPError as e:
+            return self._resolve(url, cached, None, e)
+        return self._resolve(url, cached, response)
+
+    async def afetch(self, url: str, headers: dict = None, timeout: float = None) -> CachedPage:
+        """Async `fetch` for the shared event loop. Cache reads and writes run in a worker thread."""
+        cached, is_stale = await asyncio.to_thread(self._load, url)
+        if cached is not None and not is_stale:
+            self.stats["hits"] += 1
+            return cached
+        try:
+            response = await ahttp_request("GET", url, headers=self._conditional_headers(cached, headers), timeout=timeout)
+        except httpx.HTTPError as e:
+            return self._resolve(url, cached, None, e)
+        return await asyncio.to_thread(self._resolve, url, cached, response)
+
+    def cached_text(self, page: CachedPage, extractor: str) -> tuple[bool, str | None]:
+        """(found, text) for a text extracted earlier from this version of `page`; the text itself may be None."""
+        if extractor in page.texts:
+            return True, page.texts[extractor]
+        if not page.cacheable or page.version is None:
+            return False, None
+        entry = self.store.get_entry(self._text_key(page, extractor), allow_stale=True)
+        if entry is None:
+            return False, None
+        try:
+            data = json.loads(_decompress(entry.value))
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cached text for {page.url}: {e}")
+            return False, None
+        if data.get("version") != page.version:
+            return False, None
+        page.texts[extractor] = data.get("text")
+        return True, page.texts[extractor]
+
+    def get_text(self, page: CachedPage, extractor: str, extract_fn) -> str | None:
+        """Text of `page` produced by `extract_fn(html)`, computed once per page version and extractor."""
+        found, text = self.cached_text(page, extractor)
+        if found:
+            return text
+        text = extract_fn(page.html)
+        self.set_text(page, extractor, text)
+        return text
+
+    def set_text(self, page: CachedPage, extractor: str, text: str | None):
+        page.texts[extractor] = text
+        if page.cacheable and page.version is not None:
+            data = {"version": page.version, "text": text}
+            self.store.set(self._text_key(page, extractor), _compress(json.dumps(data).encode("utf-8")))
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "store": self.store.get_stats()}
+
+
+_page_cache = None
+_page_cache_pid = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> PageCache:
+    """Process-wide page cache. SQLite connections must not cross a fork, so each process opens its own."""
+    global _page_cache, _page_cache_pid
+    with _page_cache_lock:
+        if _page_cache is None or _page_cache_pid != os.getpid():
+            _page_cache = PageCache()
+            _page_cache_pid = os.getpid()
+        return _page_cache
@@ -1,8 +1,42 @@
 # ./factcheck/utils/utils.py
 
+import os
+import hashlib
 import yaml
+import numpy as np
 
 
 def load_yaml(filepath):
     with open(filepath, "r") as file:
         return yaml.safe_load(file)
+
+
+def hash_terms(terms) -> np.ndarray:
+    """64-bit BLAKE2b hashes of `terms`, the keys of the stylometry IDF table."""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little") for term in terms),
+        dtype=np.uint64
+    )
+
+
+def save_idf_table(terms, idf, hashes_path, values_path) -> tuple[int, int]:
+    """
+    Writes a fitted vocabulary as sorted 64-bit term hashes plus the matching float32 IDF weights,
+    keeping the first term of each hash collision. Returns (terms saved, collisions dropped).
+    Each file is written next to its target and renamed, so readers never map a partial table.
+    """
+    hashes = hash_terms(terms)
+    order = np.argsort(hashes)
+    hashes = hashes[order]
+    values = np.asarray(idf, dtype=np.float32)[order]
+
+    keep = np.concatenate(([True], hashes[1:] != hashes[:-1]))
+    collisions = int(len(keep) - np.count_nonzero(keep))
+    hashes, values = hashes[keep], values[keep]
+
+    for path, array in ((values_path, values), (hashes_path, hashes)):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+    return len(hashes), collisions
@@ -1,18 +1,44 @@
 # ./factcheck/utils/web_util.py
 
-import requests
+import os
 import backoff
 import time
 import bs4
+import atexit
 import asyncio
 import re
+import threading
+import multiprocessing
+import httpx
 from bs4 import BeautifulSoup
-from httpx import AsyncHTTPTransport
-from httpx._client import AsyncClient
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from factcheck.utils.event_loop import run_coroutine
+from factcheck.utils.http_client import http_get
+from factcheck.utils.page_cache import get_page_cache
+from factcheck.utils.config_loader import config
 from factcheck.utils.logger import CustomLogger
 
 logger = CustomLogger(__name__).getlog()
 
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        HTMLParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+PARSE_BACKEND = config.get('parsing.backend', 'auto')
+PARSE_WORKERS = config.get('parsing.workers', 0) or os.cpu_count()
+PARSE_MIN_BATCH_FOR_POOL = config.get('parsing.min_batch_for_pool', 4)
+INVISIBLE_TAGS = ["style", "script", "head", "title", "meta"]
+
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.14; rv:65.0) Gecko/20100101 Firefox/65.0"
 MOBILE_USER_AGENT = "Mozilla/5.0 (Linux; Android 7.0; SM-G930V Build/NRD90M) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/59.0.3071.125 Mobile Safari/537.36"
 headers = {"User-Agent": USER_AGENT}
@@ -31,18 +57,11 @@ def is_tag_visible(element: bs4.element) -> bool:
     return True
 
 
-transport = AsyncHTTPTransport(retries=3)
-
-
 async def httpx_get(url: str, headers: dict):
+    """Fetches `url` through the page cache. Returns (True, CachedPage) or (False, None)."""
     try:
-        async with AsyncClient(transport=transport) as client:
-            response = await client.get(url, headers=headers, timeout=3)
-            response = response if response.status_code == 200 else None
-            if not response:
-                return False, None
-            else:
-                return True, response
+        page = await get_page_cache().afetch(url, headers=headers, timeout=3)
+        return True, page
     except Exception as e:  # noqa: F841
         return False, None
 
@@ -58,55 +77,150 @@ def crawl_web(query_url_dict: dict):
         for url in urls:
             task = httpx_bind_key(url=url, headers=headers, key=query)
             tasks.append(task)
-    asyncio.set_event_loop(asyncio.SelectorEventLoop())
-    loop = asyncio.get_event_loop()
-    responses = loop.run_until_complete(asyncio.gather(*tasks))
+
+    async def gather_all():
+        return await asyncio.gather(*tasks)
+
+    # Runs on the shared loop so every crawl reuses the pooled connections.
+    responses = run_coroutine(gather_all())
     return responses
 
 
 def common_web_request(url: str, query: str = None, timeout: int = 3):
-    resp = requests.get(url, headers=headers, timeout=timeout)
+    resp = http_get(url, headers=headers, timeout=timeout)
     if query:
         return resp, query
     else:
         return resp
 
 
-def parse_response(response: requests.Response, url: str, query: str = None):
-    html_content = response.text
-    url = url
+def _visible_text_selectolax(html: str) -> str:
+    tree = HTMLParser(html)
+    tree.strip_tags(INVISIBLE_TAGS)
+    root = tree.body or tree.root
+    return root.text(separator=" ") if root else ""
+
+
+def _visible_text_lxml(html: str) -> str:
+    doc = lxml.html.document_fromstring(html)
+    for element in doc.xpath("//style|//script|//head|//title|//meta|//comment()"):
+        element.drop_tree()
+    return " ".join(doc.itertext())
+
+
+def _visible_text_bs4(html: str) -> str:
+    soup = bs4.BeautifulSoup(html, "html.parser")
+    texts = soup.findAll(text=True)
+    visible_text = filter(is_tag_visible, texts)
+    return " ".join(t.strip() for t in visible_text)
+
+
+def _resolve_backend():
+    backends = {"selectolax": HTMLParser, "lxml": lxml}
+    if PARSE_BACKEND in backends and backends[PARSE_BACKEND] is not None:
+        return PARSE_BACKEND
+    if PARSE_BACKEND == "auto":
+        for name, module in backends.items():
+            if module is not None:
+                return name
+    return "bs4"
+
+
+_extractors = {"selectolax": _visible_text_selectolax, "lxml": _visible_text_lxml, "bs4": _visible_text_bs4}
+_extract_visible_text = _extractors[_resolve_backend()]
+
+
+def extract_visible_text(html: str | bytes, encoding: str = None) -> str:
+    """Visible text of an HTML page (scripts, styles, head and comments removed), whitespace-normalized."""
+    if isinstance(html, bytes):
+        html = html.decode(encoding or "utf-8", errors="replace")
+    if not html.strip():
+        return ""
+    return " ".join(_extract_visible_text(html).split())
+
+
+def parse_html(content: str | bytes, url: str, query: str = None, encoding: str = None):
+    """Parses a page, as decoded text or raw bytes. Top-level so the parse pool only has to pickle bytes and strings."""
     try:
-        soup = bs4.BeautifulSoup(html_content, "html.parser")
-        texts = soup.findAll(text=True)
-        visible_text = filter(is_tag_visible, texts)
+        web_text = extract_visible_text(content, encoding)
     except Exception as _:  # noqa: F841
         return None, url, query
+    return web_text, url, query
 
-    web_text = " ".join(t.strip() for t in visible_text).strip()
 
-    web_text = " ".join(web_text.split())
-    return web_text, url, query
+def parse_response(response: httpx.Response, url: str, query: str = None):
+    return parse_html(response.content, url, query, encoding=response.encoding)
+
+
+class ParsePool:
+    """
+    Long-lived process pool for HTML parsing, created once per process on first use.
+    Small batches, daemonic processes (e.g. Celery prefork children, which cannot fork)
+    and a broken pool all fall back to parsing inline.
+    """
+    _executor = None
+    _pid = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _get_executor(cls):
+        if multiprocessing.current_process().daemon:
+            return None
+        with cls._lock:
+            if cls._executor is None or cls._pid != os.getpid():
+                cls._executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+                cls._pid = os.getpid()
+            return cls._executor
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            if cls._executor is not None and cls._pid == os.getpid():
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+
+    @classmethod
+    def parse(cls, documents: list[tuple]) -> list[tuple]:
+        """Parses (content, encoding, url, query) tuples into (web_text, url, query) tuples, in order.
+        `content` is decoded text or raw bytes; `encoding` only applies to bytes."""
+        if not documents:
+            return []
+        executor = cls._get_executor() if len(documents) >= PARSE_MIN_BATCH_FOR_POOL else None
+        if executor is not None:
+            try:
+                chunksize = max(1, len(documents) // (PARSE_WORKERS * 4))
+                return list(executor.map(_parse_document, documents, chunksize=chunksize))
+            except BrokenProcessPool as e:
+                logger.warning(f"Parse pool is broken ({e}). Recreating it and parsing this batch inline.")
+                with cls._lock:
+                    cls._executor = None
+        return [_parse_document(doc) for doc in documents]
+
+
+def _parse_document(document: tuple):
+    content, encoding, url, query = document
+    return parse_html(content, url, query, encoding=encoding)
+
+
+def parse_documents(documents: list[tuple]) -> list[tuple]:
+    return ParsePool.parse(documents)
+
+
+atexit.register(ParsePool.shutdown)
 
 
 def scrape_url(url: str, timeout: float = 3):
 
     try:
-        response = requests.get(url, timeout=timeout)
+        response = http_get(url, timeout=timeout)
         response.raise_for_status()
-    except requests.exceptions.RequestException as _:  # noqa: F841
+    except httpx.HTTPError as _:  # noqa: F841
         return None, url
 
     try:
-        soup = bs4.BeautifulSoup(response.text, "html.parser")
-        texts = soup.findAll(text=True)
-
-        visible_text = filter(is_tag_visible, texts)
+        web_text = extract_visible_text(response.content, response.encoding)
     except Exception as _:  # noqa: F841
         return None, url
-
-    web_text = " ".join(t.strip() for t in visible_text).strip()
-
-    web_text = " ".join(web_text.split())
     return web_text, url
 
 
@@ -128,38 +242,42 @@ def is_url(text):
     return re.match(url_pattern, text) is not None
 
 
+def _extract_main_content(html: str) -> str | None:
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    main_content = soup.find('article') or soup.find('main') or soup.find('div', class_=re.compile(r'content|main|post|body'))
+    
+    if main_content:
+        logger.info("Found main content tag (article, main, etc.). Extracting text.")
+        text = main_content.get_text(separator=' ', strip=True)
+    else:
+        logger.warning("Main content tag not found. Using entire <body> as fallback.")
+        body = soup.find('body')
+        if not body:
+            return None
+        text = body.get_text(separator=' ', strip=True)
+    return ' '.join(text.split())
+
+
 def scrape_url_content(url):
     logger.info(f"--- Starting URL scrape process: {url} ---")
     try:
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-        response = requests.get(url, headers=headers, timeout=15)
-        logger.info(f"Request successful, Status Code: {response.status_code}")
-        
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        main_content = soup.find('article') or soup.find('main') or soup.find('div', class_=re.compile(r'content|main|post|body'))
-        
-        if main_content:
-            logger.info("Found main content tag (article, main, etc.). Extracting text.")
-            text = main_content.get_text(separator=' ', strip=True)
-        else:
-            logger.warning("Main content tag not found. Using entire <body> as fallback.")
-            body = soup.find('body')
-            if body:
-                text = body.get_text(separator=' ', strip=True)
-            else:
-                logger.error("Could not find <body> tag in the page.")
-                return None, "Could not find any content in the page."
+        page_cache = get_page_cache()
+        page = page_cache.fetch(url, headers=headers, timeout=15)
+        logger.info(f"Page fetched ({'cache' if page.from_cache else 'network'}).")
+
+        cleaned_text = page_cache.get_text(page, "main_content", _extract_main_content)
+        if cleaned_text is None:
+            logger.error("Could not find <body> tag in the page.")
+            return None, "Could not find any content in the page."
         
-        cleaned_text = ' '.join(text.split())
         logger.info(f"--- Scrape successful! Extracted {len(cleaned_text)} chars. ---")
         return cleaned_text, None
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error requesting URL: {e}", exc_info=True)
         return None, f"Error fetching the URL. See server log for details."
     except Exception as e:
         logger.error(f"Unexpected error during content parsing: {e}", exc_info=True)
-        return None, f"An unexpected error occurred. See server log for details."
\ No newline at end of file
+        return None, f"An unexpected error occurred. See server log for details."
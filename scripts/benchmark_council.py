@@ -0,0 +1,100 @@
+# scripts/benchmark_council.py
+
+import sys
+import re
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from factcheck.utils.llmclient import CLIENTS, model2client
+from factcheck.utils.llmclient.base import BaseClient
+from factcheck.utils.api_config import load_api_config
+from factcheck.utils.kv_cache import NullKVCache
+from factcheck.utils.prompt import prompt_mapper
+from factcheck.core.ClaimVerify import ClaimVerify
+
+
+class SimulatedCouncilClient(BaseClient):
+    """Answers every council prompt after a fixed latency, to measure the client layer without spending quota."""
+
+    def __init__(self, latency: float, model: str = "simulated"):
+        super().__init__(model, api_config={}, max_requests_per_minute=100000, request_window=60)
+        self.latency = latency
+
+    def _fake_verifications(self, messages: list) -> str:
+        prompt = messages[-1]["content"]
+        ids = sorted(set(re.findall(r'"id": "(E\d+)"', prompt)))
+        return json.dumps({
+            "verifications": [{"id": e_id, "reasoning": "Simulated.", "relationship": "SUPPORTS"} for e_id in ids]
+        })
+
+    def _call(self, messages: list, **kwargs):
+        time.sleep(self.latency)
+        return self._fake_verifications(messages)
+
+    async def _acall(self, messages: list, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self._fake_verifications(messages)
+
+    def _log_usage(self, usage_dict):
+        pass
+
+    def construct_message_list(self, prompt_list: list[str], system_role: str = "You are a helpful assistant designed to output JSON."):
+        return [[{"role": "user", "content": f"{system_role}\n\n{prompt}"}] for prompt in prompt_list]
+
+
+def build_claims(num_claims: int, num_evidences: int) -> dict:
+    claims = {}
+    for i in range(num_claims):
+        claim = f"Benchmark claim #{i + 1}: The Eiffel Tower was completed in 1889."
+        claims[claim] = [
+            {"text": f"Evidence {j + 1} for claim {i + 1}: the tower opened for the 1889 World's Fair.",
+             "url": f"https://example.org/{i}/{j}", "trust_level": "high"}
+            for j in range(num_evidences)
+        ]
+    return claims
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Council verification throughput vs. requests in flight")
+    parser.add_argument("--model", type=str, default="gemini-2.5-flash")
+    parser.add_argument("--client", type=str, default=None, choices=CLIENTS.keys())
+    parser.add_argument("--prompt", type=str, default="gemini_prompt")
+    parser.add_argument("--claims", type=int, default=10)
+    parser.add_argument("--evidences", type=int, default=3)
+    parser.add_argument("--concurrency", type=str, default="1,2,4,8,16,32")
+    parser.add_argument("--simulate-latency", type=float, default=None,
+                        help="Use a simulated client with this per-request latency (seconds) instead of a real API.")
+    args = parser.parse_args()
+
+    if args.simulate_latency is not None:
+        llm_client = SimulatedCouncilClient(latency=args.simulate_latency)
+    else:
+        LLMClientClass = CLIENTS[args.client] if args.client else model2client(args.model)
+        llm_client = LLMClientClass(model=args.model, api_config=load_api_config())
+
+    # Repeated runs must hit the API, not the response cache.
+    llm_client.response_cache = NullKVCache('llm')
+    verifier = ClaimVerify(llm_client=llm_client, prompt=prompt_mapper(args.prompt))
+    claims = build_claims(args.claims, args.evidences)
+
+    print(f"{'in-flight':>10} | {'requests':>8} | {'seconds':>8} | {'req/s':>8} | {'claims/s':>8}")
+    print("-" * 56)
+    for concurrency in [int(c) for c in args.concurrency.split(",")]:
+        llm_client.max_concurrency = concurrency
+        llm_client._semaphore = None
+
+        start = time.perf_counter()
+        verifier.verify_claims(claims, batch_size=len(claims))
+        elapsed = time.perf_counter() - start
+
+        num_requests = len(claims) * 3
+        print(f"{concurrency:>10} | {num_requests:>8} | {elapsed:>8.2f} | {num_requests / elapsed:>8.2f} | {len(claims) / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
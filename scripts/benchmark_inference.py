@@ -0,0 +1,101 @@
+# scripts/benchmark_inference.py
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from factcheck.utils.config_loader import config
+from factcheck.utils.inference import load_sentence_transformer, load_cross_encoder
+
+SAMPLE_TEXTS = [
+    "The Eiffel Tower was completed in 1889 for the World's Fair in Paris.",
+    "Water boils at 100 degrees Celsius at sea level.",
+    "The Great Wall of China is visible from the Moon with the naked eye.",
+    "Albert Einstein received the Nobel Prize in Physics in 1921 for the photoelectric effect.",
+    "The human body has 206 bones in adulthood.",
+    "Mount Everest is the tallest mountain above sea level, at about 8,849 metres.",
+    "Vaccines cause autism according to a retracted 1998 study.",
+    "The Amazon rainforest produces roughly 20 percent of the oxygen in Earth's atmosphere.",
+]
+
+
+def load_texts(path: str | None, n: int) -> list[str]:
+    texts = SAMPLE_TEXTS
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    return [texts[i % len(texts)] for i in range(n)]
+
+
+def time_call(fn, repeats: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def bench_embedder(model_name: str, texts: list[str], repeats: int, batch_size: int):
+    results = {}
+    for backend in ("torch", "onnx"):
+        model = load_sentence_transformer(model_name, backend=backend)
+        embeddings = model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+        latency = time_call(lambda: model.encode(texts, batch_size=batch_size), repeats)
+        results[backend] = (embeddings, latency)
+
+    reference, candidate = results["torch"][0], results["onnx"][0]
+    cosine = np.sum(reference * candidate, axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    )
+    print_row(model_name, results["torch"][1], results["onnx"][1], f"cosine mean={cosine.mean():.4f} min={cosine.min():.4f}")
+
+
+def bench_cross_encoder(model_name: str, texts: list[str], repeats: int, batch_size: int):
+    query = texts[0]
+    pairs = [(query, passage) for passage in texts]
+    results = {}
+    for backend in ("torch", "onnx"):
+        model = load_cross_encoder(model_name, backend=backend, max_length=512)
+        scores = np.asarray(model.predict(pairs, batch_size=batch_size, show_progress_bar=False))
+        latency = time_call(lambda: model.predict(pairs, batch_size=batch_size, show_progress_bar=False), repeats)
+        results[backend] = (scores, latency)
+
+    reference, candidate = results["torch"][0], results["onnx"][0]
+    pearson = np.corrcoef(reference, candidate)[0, 1]
+    top_k = min(5, len(pairs))
+    overlap = len(set(np.argsort(-reference)[:top_k]) & set(np.argsort(-candidate)[:top_k])) / top_k
+    print_row(model_name, results["torch"][1], results["onnx"][1], f"pearson={pearson:.4f} top{top_k} overlap={overlap:.0%}")
+
+
+def print_row(model_name: str, torch_latency: float, onnx_latency: float, accuracy: str):
+    print(f"{model_name:<40} | {torch_latency * 1000:>9.1f} | {onnx_latency * 1000:>9.1f} | "
+          f"{torch_latency / onnx_latency:>6.2f}x | {accuracy}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PyTorch vs ONNX Runtime (int8) latency and agreement")
+    parser.add_argument("--embedders", type=str,
+                        default=f"{config.get('vectordb.embedding_model', 'intfloat/e5-base-v2')},all-MiniLM-L6-v2")
+    parser.add_argument("--cross-encoders", type=str, default="cross-encoder/ms-marco-MiniLM-L-6-v2")
+    parser.add_argument("--texts-file", type=str, default=None, help="One text per line; defaults to built-in samples.")
+    parser.add_argument("--num-texts", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = load_texts(args.texts_file, args.num_texts)
+    print(f"{'model':<40} | {'torch ms':>9} | {'onnx ms':>9} | {'speedup':>7} | agreement")
+    print("-" * 100)
+    for model_name in filter(None, args.embedders.split(",")):
+        bench_embedder(model_name, texts, args.repeats, args.batch_size)
+    for model_name in filter(None, args.cross_encoders.split(",")):
+        bench_cross_encoder(model_name, texts, args.repeats, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
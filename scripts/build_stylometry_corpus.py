@@ -4,7 +4,6 @@ import sys
 import os
 import re
 import json
-import pickle
 import math
 import numpy as np
 from pathlib import Path
@@ -14,6 +13,7 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from factcheck.utils.config_loader import PROJECT_ROOT
+from factcheck.utils.utils import save_idf_table
 
 try:
     from datasets import load_dataset
@@ -23,7 +23,8 @@ except ImportError:
     sys.exit(1)
 
 MODEL_DIR = PROJECT_ROOT / "models" / "stylometry"
-IDF_VECTOR_PATH = MODEL_DIR / "idf_vector.pkl"
+IDF_HASHES_PATH = MODEL_DIR / "idf_hashes.npy"
+IDF_VALUES_PATH = MODEL_DIR / "idf_values.npy"
 ENTROPY_STATS_PATH = MODEL_DIR / "entropy_stats.json"
 
 
@@ -41,6 +42,19 @@ def calculate_entropy(text: str):
     return entropy
 
 
+def export_idf_table(vectorizer: TfidfVectorizer):
+    """
+    Writes the fitted vocabulary as sorted 64-bit term hashes plus the matching float32 IDF weights.
+    StylometryAnalyzer memory-maps both and looks terms up with a binary search; no sklearn or pickle at runtime.
+    """
+    num_terms, collisions = save_idf_table(
+        vectorizer.get_feature_names_out(), vectorizer.idf_, IDF_HASHES_PATH, IDF_VALUES_PATH
+    )
+    if collisions:
+        print(f"   -> Warning: {collisions} hash collisions in the vocabulary; kept the first of each.")
+    print(f"   -> Saved {num_terms} IDF terms to: {IDF_HASHES_PATH.name}, {IDF_VALUES_PATH.name}")
+
+
 def main():
     print(f"Output Directory: {MODEL_DIR}")
     
@@ -66,10 +80,7 @@ def main():
         stop_words='english'
     )
     vectorizer.fit(corpus)
-   
-    with open(IDF_VECTOR_PATH, 'wb') as f:
-        pickle.dump(vectorizer, f)
-    print(f"   -> Saved IDF model to: {IDF_VECTOR_PATH.name}")
+    export_idf_table(vectorizer)
 
     print("\n[3/3] Calculating Entropy Statistics...")
     entropy_values = [calculate_entropy(text) for text in corpus]
@@ -46,11 +46,9 @@ def build_database():
     logger.info(f"Ingesting {len(chunks)} chunks into collection '{COLLECTION_NAME}'...")
     
     try:
-        from chromadb.utils import embedding_functions
+        from factcheck.utils.embedding_service import build_embedding_function
         EMBEDDING_MODEL_NAME = config.get('vectordb.embedding_model')
-        sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=EMBEDDING_MODEL_NAME
-        )
+        sentence_transformer_ef = build_embedding_function(EMBEDDING_MODEL_NAME)
         
         collection = get_vector_collection(
             collection_name=COLLECTION_NAME,
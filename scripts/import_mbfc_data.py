@@ -2,7 +2,6 @@
 
 import sys
 import json
-import sqlite3
 from pathlib import Path
 from datasets import load_dataset
 
@@ -29,10 +28,23 @@ def setup_database(conn):
         )
     ''')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_domain ON sources (domain)')
-    conn.commit()
     print("Table 'sources' created.")
 
 
+def iter_source_rows(dataset):
+    for record in dataset:
+        domain = record.get('domain')
+        if not domain:
+            continue
+        yield (
+            domain.strip(),
+            record.get('page', 'Unknown'),
+            (record.get('bias_rating') or 'UNKNOWN').upper(),
+            (record.get('factual_reporting') or 'UNKNOWN').upper(),
+            record.get('country', 'Unknown')
+        )
+
+
 def main():
     print("Loading dataset from HuggingFace...")
     dataset = load_dataset("zainmujahid/mbfc-media-outlets", split="train")
@@ -40,35 +52,24 @@ def main():
     print("Connecting to Database via Provider...")
     conn = DatabaseProvider.get_sqlite_connection()
     
+    # Explicit transaction so the table is dropped, recreated and filled atomically:
+    # running workers reload it when the file changes and must never see it half-written.
+    conn.isolation_level = None
     try:
+        conn.execute('BEGIN')
         setup_database(conn)
-        cursor = conn.cursor()
-        
-        count = 0
-        for record in dataset:
-            domain = record.get('domain')
-            if not domain: 
-                continue
-            
-            try:
-                cursor.execute('''
-                    INSERT INTO sources (domain, name, bias, credibility, country)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    domain.strip(),
-                    record.get('page', 'Unknown'),
-                    (record.get('bias_rating') or 'UNKNOWN').upper(),
-                    (record.get('factual_reporting') or 'UNKNOWN').upper(),
-                    record.get('country', 'Unknown')
-                ))
-                count += 1
-            except sqlite3.IntegrityError:
-                pass
-        
-        conn.commit()
+        # OR IGNORE keeps the first record of a duplicated domain.
+        cursor = conn.executemany('''
+            INSERT OR IGNORE INTO sources (domain, name, bias, credibility, country)
+            VALUES (?, ?, ?, ?, ?)
+        ''', iter_source_rows(dataset))
+        count = cursor.rowcount
+        conn.execute('COMMIT')
         print(f"Successfully imported {count} sources into SQLite.")
         
     except Exception as e:
+        if conn.in_transaction:
+            conn.execute('ROLLBACK')
         print(f"Error: {e}")
     finally:
         conn.close()
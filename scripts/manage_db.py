@@ -9,6 +9,7 @@ sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from factcheck.utils.database import DatabaseProvider, get_vector_collection
 from factcheck.utils.config_loader import config
+from factcheck.utils.embedding_service import build_embedding_function
 
 
 def reset_screening_knowledge():
@@ -25,12 +26,8 @@ def reset_screening_knowledge():
             print("   -> Collection did not exist.")
         
         print(f"   -> Re-creating collection '{collection_name}'...")
-        from chromadb.utils import embedding_functions
         emb_model = config.get('vectordb.embedding_model', 'intfloat/e5-base-v2')
-        
-        sentence_transformer_ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=emb_model
-        )
+        sentence_transformer_ef = build_embedding_function(emb_model)
         get_vector_collection(
             collection_name=collection_name,
             embedding_function=sentence_transformer_ef